@@ -0,0 +1,134 @@
+"""
+HTTP client and on-disk result spool used by the search bot to talk to the API.
+
+Every result is written to the spool first and uploaded from there in order, so
+results survive API restarts and outages, and uploads reuse pooled keep-alive
+connections instead of opening a new one per request.
+"""
+import json
+import sqlite3
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for every API request
+DEFAULT_TIMEOUT = (3.05, 30)
+
+# Responses meaning the API (or a proxy in front of it) is restarting or overloaded
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class ApiClient:
+    """
+    A requests.Session bound to the API's base URL, with a keep-alive connection pool,
+    timeouts and bounded retries with exponential backoff. Connection failures are
+    retried for every method; read errors and RETRY_STATUSES only for GET, since the
+    API may already have applied a POST (see post_idempotent).
+
+    post_idempotent sends through a second session whose adapter never retries, so
+    its own loop is the only retrier and a request is sent at most retries + 1 times.
+    """
+
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.single_try_session = requests.Session()
+        single_try_adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=0, raise_on_status=False),
+        )
+        self.single_try_session.mount("http://", single_try_adapter)
+        self.single_try_session.mount("https://", single_try_adapter)
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def post_idempotent(self, path, **kwargs):
+        """
+        POST retried like a GET: on read errors and RETRY_STATUSES, with exponential
+        backoff. Only for requests that the API applies once however often they arrive,
+        such as a lease request carrying its own lease_token.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.single_try_session.post(f"{self.base_url}{path}", **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def close(self):
+        self.session.close()
+        self.single_try_session.close()
+
+
+class ResultSpool:
+    """
+    Append-only queue of JSON items in a SQLite file. Each append is one transaction,
+    synced to disk before it returns, so a keyword's results cost one fsync. Items are
+    read back oldest first and removed only once they have been delivered.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = FULL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def append(self, items):
+        with self.connection:
+            self.connection.executemany("INSERT INTO spool (item) VALUES (?)", [(json.dumps(item),) for item in items])
+
+    def peek(self, limit):
+        """
+        Return up to limit of the oldest items as (id, item) pairs.
+        """
+        rows = self.connection.execute("SELECT id, item FROM spool ORDER BY id LIMIT ?", (limit,))
+        return [(item_id, json.loads(item)) for item_id, item in rows]
+
+    def remove(self, last_id):
+        """
+        Remove every item up to and including last_id.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM spool WHERE id <= ?", (last_id,))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -1,24 +1,203 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from collections import Counter, OrderedDict
+from functools import wraps
+from itertools import groupby
+import atexit
+import base64
+import click
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
 import openpyxl
+from domains import normalize_host
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+try:
+    import orjson
+except ImportError:  # columnar responses fall back to the json module
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # columnar responses are then compressed with gzip only
+    brotli = None
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///data.db'
+# Storage configuration. DATABASE_URL selects the primary (write) database and
+# defaults to SQLite in the instance folder; it can point at a server database.
+# GET requests read through a separate 'read' engine and pool, on DATABASE_READ_URL
+# (e.g. a replica) or the primary database; set DATABASE_READ_URL to '' to disable it.
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///data.db')
+app.config['DATABASE_READ_URL'] = os.environ.get('DATABASE_READ_URL', app.config['SQLALCHEMY_DATABASE_URI'])
+# Results older than RESULT_ARCHIVE_AFTER_DAYS are moved by `flask archive-results`, a
+# whole month at a time, into result_archive_YYYY_MM tables. They stay in the primary
+# database unless RESULT_ARCHIVE_URL points them at a separate (cold) one.
+app.config['RESULT_ARCHIVE_AFTER_DAYS'] = 180
+app.config['RESULT_ARCHIVE_URL'] = os.environ.get('RESULT_ARCHIVE_URL', '')
+app.config['SQLALCHEMY_BINDS'] = {}
+if app.config['DATABASE_READ_URL']:
+    app.config['SQLALCHEMY_BINDS']['read'] = app.config['DATABASE_READ_URL']
+if app.config['RESULT_ARCHIVE_URL']:
+    app.config['SQLALCHEMY_BINDS']['archive'] = app.config['RESULT_ARCHIVE_URL']
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
+# Applied to every new SQLite connection. WAL lets readers run while a write is in
+# progress; the read engine additionally sets query_only. SQLITE_PRAGMAS=off leaves
+# SQLite's defaults (rollback journal, no tuning), e.g. as a benchmark baseline.
+app.config['SQLITE_PRAGMAS'] = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'cache_size': -64000,  # KiB
+    'mmap_size': 256 * 1024 * 1024,  # bytes
+} if os.environ.get('SQLITE_PRAGMAS', '').lower() != 'off' else {}
+# Audit log writer: flush every LOG_FLUSH_INTERVAL seconds or LOG_BATCH_SIZE entries,
+# dropping entries once LOG_QUEUE_SIZE are waiting
+app.config['LOG_FLUSH_INTERVAL'] = 0.5
+app.config['LOG_BATCH_SIZE'] = 200
+app.config['LOG_QUEUE_SIZE'] = 10000
+# Raw logs older than LOG_RETENTION_DAYS are rolled into hourly per-action counts by
+# `flask compact-logs`, run from a scheduled job (set it to None to keep everything)
+app.config['LOG_RETENTION_DAYS'] = 30
+# Serialized GET responses kept in memory (entries, and the largest body cached)
+app.config['RESPONSE_CACHE_SIZE'] = 256
+app.config['RESPONSE_CACHE_MAX_BYTES'] = 8 * 1024 * 1024
+# ?format=columnar bodies of at least this many bytes are compressed (brotli or gzip,
+# per Accept-Encoding) at these levels; set the size to None to never compress
+app.config['COLUMNAR_COMPRESS_MIN_BYTES'] = 1024
+app.config['COLUMNAR_GZIP_LEVEL'] = 6
+app.config['COLUMNAR_BROTLI_QUALITY'] = 5
+# Suggestions are interned into the suggestion tables on ingest and, unless this is
+# disabled, also kept as the raw JSON list on every Result row. Disabling it changes the
+# API: /results and /results/export then return no suggestions for new rows.
+app.config['KEEP_RESULT_SUGGESTIONS'] = True
+# A keyword is due for another check KEYWORD_CHECK_INTERVAL seconds after results for
+# it were last ingested; POST /keywords/due leases the keywords it hands out to one
+# caller for KEYWORD_LEASE_SECONDS
+app.config['KEYWORD_CHECK_INTERVAL'] = 24 * 3600
+app.config['KEYWORD_LEASE_SECONDS'] = 15 * 60
+# Upper bounds of the /metrics request duration histogram buckets, in seconds
+app.config['METRICS_DURATION_BUCKETS'] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# SQL statements slower than this many seconds are logged with their endpoint and
+# parameter shape (None disables the slow-query log)
+app.config['SLOW_QUERY_THRESHOLD'] = float(os.environ['SLOW_QUERY_THRESHOLD']) if os.environ.get('SLOW_QUERY_THRESHOLD') else None
+
+# Session that sends GET/HEAD request reads to the read engine and everything else,
+# including any flush, to the primary engine
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and 'read' in self._db.engines \
+                and has_request_context() and request.method in ('GET', 'HEAD'):
+            return self._db.engines['read']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 api = Api(app)
 
+def apply_sqlite_pragmas(read_only):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in app.config['SQLITE_PRAGMAS'].items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
+        cursor.close()
+    return on_connect
+
+with app.app_context():
+    for bind_key, engine in db.engines.items():
+        if engine.dialect.name == 'sqlite':
+            db.event.listen(engine, 'connect', apply_sqlite_pragmas(read_only=bind_key == 'read'))
+
+# Page sizes for GET /results
+RESULTS_PAGE_SIZE = 500
+RESULTS_MAX_PAGE_SIZE = 5000
+
+# Page size limit for GET /keywords and the row/chunk sizes used when streaming it
+KEYWORDS_MAX_PAGE_SIZE = 5000
+
+# Page size limit for GET /websites with page/limit
+WEBSITES_MAX_PAGE_SIZE = 5000
+
+# Page sizes for GET /logs
+LOGS_PAGE_SIZE = 100
+LOGS_MAX_PAGE_SIZE = 1000
+
+# Default and maximum number of runs returned by GET /bot/runs
+BOT_RUNS_PAGE_SIZE = 30
+BOT_RUNS_MAX_PAGE_SIZE = 1000
+BOT_RUN_FIELDS = ('run_id', 'started_at', 'finished_at', 'duration_seconds', 'keywords', 'results', 'sleep_seconds')
+
+# Rows per transaction for Excel imports, and how many row errors a job keeps
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 100
+
+# Rows fetched from the database cursor per chunk when exporting results. An XLSX file
+# can only be sent once complete and openpyxl keeps every distinct string of it in
+# memory, so XLSX exports are refused above EXPORT_XLSX_MAX_ROWS; CSV and Parquet stream.
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_XLSX_MAX_ROWS = 100_000
+EXPORT_COLUMNS = ('timestamp', 'keyword', 'domain', 'website_name', 'min_rank', 'max_rank', 'avg_rank', 'suggestions')
+
+# Page size limit for GET /suggestions and rows per transaction when backfilling them
+SUGGESTIONS_MAX_PAGE_SIZE = 5000
+SUGGESTIONS_BACKFILL_CHUNK_SIZE = 1000
+
+# Default and maximum number of matches returned by ?q= searches
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 200
+
+# Maximum number of items accepted by one POST /keywords/bulk or /websites/bulk
+BULK_MAX_SIZE = 10000
+
+# Maximum number of results accepted by one POST /results/batch
+RESULTS_BATCH_MAX_SIZE = 1000
+STREAM_FETCH_SIZE = 1000
+STREAM_CHUNK_ITEMS = 500
+
+# Results moved per transaction by archive-results
+ARCHIVE_CHUNK_SIZE = 5000
+
+# Default and maximum number of keywords leased by one POST /keywords/due, and the
+# lease tokens callers may choose
+DUE_KEYWORDS_PAGE_SIZE = 10
+DUE_KEYWORDS_MAX_PAGE_SIZE = 500
+LEASE_TOKEN_PATTERN = re.compile(r'[0-9A-Za-z_-]{1,32}')
+
+# next_due_at given to keywords that have never been checked, so they come first
+NEVER_CHECKED = datetime(1970, 1, 1)
+
 # Models
 class Website(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    domain = db.Column(db.String(100), unique=True, nullable=False)
+    domain = db.Column(db.String(100), unique=True, nullable=False)  # normalized with domains.normalize_host
+
+    @db.validates('domain')
+    def validate_domain(self, key, domain):
+        return normalize_host(domain)
 
 class Keyword(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -44,6 +223,13 @@ class Result(db.Model):
     keyword = db.relationship('Keyword', backref=db.backref('results', lazy=True))
     website = db.relationship('Website', backref=db.backref('results', lazy=True))
 
+    # Composite indexes backing the keyset-paginated GET /results filters
+    __table_args__ = (
+        db.Index('ix_result_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_result_keyword_timestamp', 'keyword_id', 'timestamp'),
+        db.Index('ix_result_website_timestamp', 'website_id', 'timestamp'),
+    )
+
     def __init__(self, keyword_id, website_id, min_rank, max_rank, avg_rank, suggestions=None):
         self.keyword_id = keyword_id
         self.website_id = website_id
@@ -68,25 +254,574 @@ class Log(db.Model):
     path = db.Column(db.String(200), nullable=False)
     status_code = db.Column(db.Integer, nullable=False)
 
-# Helper function to log actions
-def log_action(action, details=None):
-    # Get the request details
-    ip_address = request.remote_addr
-    http_method = request.method
-    path = request.path
-    status_code = 200  # Default status code for now
-
-    log_entry = Log(
-        action=action,
-        details=details,
-        ip_address=ip_address,
-        http_method=http_method,
-        path=path,
-        status_code=status_code
+    __table_args__ = (
+        db.Index('ix_log_timestamp_id', 'timestamp', 'id'),
+    )
+
+# Per-action request counts for each hour of compacted (deleted) raw logs
+class LogHourly(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)
+    action = db.Column(db.String(100), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('hour', 'action'),
+    )
+
+# Single row recording the last time the bot called /bot
+class BotHeartbeat(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    last_seen = db.Column(db.DateTime, nullable=False)
+    last_action = db.Column(db.String(100), nullable=False)
+
+# Summary of one bot run as reported by its profiler (see run_profiler.py)
+class BotRun(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(32), nullable=False, unique=True)
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=False)
+    duration_seconds = db.Column(db.Float, nullable=False)
+    keywords = db.Column(db.Integer, nullable=False)
+    results = db.Column(db.Integer, nullable=False)
+    keywords_per_minute = db.Column(db.Float, nullable=True)
+    sleep_seconds = db.Column(db.Float, nullable=False)
+    summary = db.Column(db.JSON, nullable=False)  # the full summary, with per-phase totals and percentiles
+
+    __table_args__ = (
+        db.Index('ix_bot_run_started_at', 'started_at'),
+    )
+
+# Daily per keyword/website rank rollup, maintained on every result insert
+class ResultDaily(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), nullable=False)
+    website_id = db.Column(db.Integer, db.ForeignKey('website.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+    best_rank = db.Column(db.Integer, nullable=False)  # min of Result.min_rank
+    worst_rank = db.Column(db.Integer, nullable=False)  # max of Result.min_rank
+    avg_rank = db.Column(db.Float, nullable=False)  # running mean of Result.avg_rank
+
+    __table_args__ = (
+        db.UniqueConstraint('keyword_id', 'website_id', 'day'),
+        db.Index('ix_result_daily_day', 'day'),
+    )
+
+# Most recent result per keyword/website pair and how far it moved from the one before
+class LatestResult(db.Model):
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), primary_key=True)
+    website_id = db.Column(db.Integer, db.ForeignKey('website.id'), primary_key=True)
+    min_rank = db.Column(db.Integer, nullable=False)
+    max_rank = db.Column(db.Integer, nullable=False)
+    avg_rank = db.Column(db.Float, nullable=False)
+    previous_rank = db.Column(db.Integer, nullable=True)  # min_rank of the previous result
+    delta = db.Column(db.Integer, nullable=True)  # previous_rank - min_rank, positive when the site moved up
+    timestamp = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_latest_result_delta', 'delta'),
+    )
+
+# One month of results moved out of Result into its archive table
+class ResultArchive(db.Model):
+    start = db.Column(db.DateTime, primary_key=True)  # first instant of the month
+    end = db.Column(db.DateTime, nullable=False)  # first instant of the next month
+    table_name = db.Column(db.String(40), nullable=False)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+# When each keyword is next due for a check. While a bot run holds a lease on the
+# keyword, next_due_at is the lease expiry, so nobody else is handed it until then.
+class KeywordSchedule(db.Model):
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), primary_key=True)
+    next_due_at = db.Column(db.DateTime, nullable=False)
+    check_count = db.Column(db.Integer, nullable=False, default=0)
+    last_checked_at = db.Column(db.DateTime, nullable=True)
+    lease_token = db.Column(db.String(32), nullable=True)  # set while leased
+
+    __table_args__ = (
+        db.Index('ix_keyword_schedule_next_due_at', 'next_due_at'),
+        db.Index('ix_keyword_schedule_lease_token', 'lease_token'),
+    )
+
+# Version counter of each cached collection, bumped by every write to it. Kept in the
+# database so all worker processes and the CLI commands share one count.
+class CollectionVersion(db.Model):
+    name = db.Column(db.String(20), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Background Excel import and its progress
+class ImportJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done or failed
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    keywords_created = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.JSON, nullable=False, default=list)  # first IMPORT_MAX_ERRORS row errors
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+# Each distinct autocomplete suggestion, stored once
+class Suggestion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.String(255), nullable=False, unique=True)
+    search_text = db.Column(db.String(255), nullable=False, index=True)  # lowercased, for prefix search
+
+# When and how often a suggestion was seen for a keyword
+class KeywordSuggestion(db.Model):
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), primary_key=True)
+    suggestion_id = db.Column(db.Integer, db.ForeignKey('suggestion.id'), primary_key=True)
+    first_seen = db.Column(db.DateTime, nullable=False)
+    last_seen = db.Column(db.DateTime, nullable=False)
+    count = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_keyword_suggestion_keyword_last_seen', 'keyword_id', 'last_seen'),
+        db.Index('ix_keyword_suggestion_first_seen', 'first_seen'),
+        db.Index('ix_keyword_suggestion_suggestion', 'suggestion_id'),
     )
-    db.session.add(log_entry)
+
+# Progress of `flask backfill-suggestions` (a single row). Results up to last_result_id
+# were stored before suggestions were interned on ingest; those up to interned_through_id
+# have been interned by the backfill since. Later results were interned on ingest.
+class SuggestionBackfill(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    last_result_id = db.Column(db.Integer, nullable=False)
+    interned_through_id = db.Column(db.Integer, nullable=False, default=0)
+
+# Create indexes declared after the tables already existed (create_all skips those)
+def upgrade_schema():
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    create_search_indexes()
+    backfill_keyword_schedules()
+    record_suggestion_backfill_start()
+    # Websites stored before domains were normalized would otherwise never match a lookup
+    changed, conflicts = normalize_stored_domains()
+    for domain in conflicts:
+        app.logger.warning(f"Website domain '{domain}' left unnormalized: its normalized form belongs to another website (or is empty)")
+
+# Schedule rows for keywords created before the scheduler, or written around the API
+def backfill_keyword_schedules():
+    with db.engine.begin() as connection:
+        connection.execute(
+            upsert(KeywordSchedule).from_select(
+                ['keyword_id', 'next_due_at', 'check_count'],
+                db.select(Keyword.id, db.literal(NEVER_CHECKED, db.DateTime), db.literal(0))
+                .where(~db.exists().where(KeywordSchedule.keyword_id == Keyword.id)),
+            ).on_conflict_do_nothing()
+        )
+
+# The first time the schema is upgraded with the suggestion tables in place, before this
+# process ingests anything, mark every stored result as one for the backfill to intern
+def record_suggestion_backfill_start():
+    with db.engine.begin() as connection:
+        last_result_id = connection.execute(db.select(db.func.coalesce(db.func.max(Result.id), 0))).scalar()
+        connection.execute(
+            upsert(SuggestionBackfill)
+            .values(id=1, last_result_id=last_result_id, interned_through_id=0)
+            .on_conflict_do_nothing()
+        )
+
+# SQLite FTS5 shadow tables (external content) over keyword and website text
+FTS_TABLES = {
+    'keyword_fts': ('keyword', ('keyword',)),
+    'website_fts': ('website', ('name', 'domain')),
+}
+
+# Create the FTS5 tables with triggers keeping them in sync, indexing existing rows on creation
+def create_search_indexes():
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as connection:
+        for fts_table, (table, columns) in FTS_TABLES.items():
+            exists = connection.execute(
+                db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts_table}
+            ).first()
+            if exists:
+                continue
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{column}' for column in columns)
+            old_values = ', '.join(f'old.{column}' for column in columns)
+            connection.execute(db.text(
+                f"CREATE VIRTUAL TABLE {fts_table} USING fts5({column_list}, content='{table}', content_rowid='id', prefix='2 3')"
+            ))
+            connection.execute(db.text(
+                f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            ))
+            connection.execute(db.text(
+                f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+            ))
+            connection.execute(db.text(
+                f"CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+            ))
+            connection.execute(db.text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+# Ids of the rows matching a ?q= search, best match first. Every word is matched as
+# a prefix; without the FTS tables (other databases) it falls back to LIKE.
+def search_ids(fts_table, model, q, limit):
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return []
+    if db.engine.dialect.name == 'sqlite' and db.session.execute(
+        db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts_table}
+    ).first():
+        match = ' '.join(f'"{term}"*' for term in terms)
+        rows = db.session.execute(
+            db.text(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :match ORDER BY rank LIMIT :limit'),
+            {'match': match, 'limit': limit},
+        )
+        return [row[0] for row in rows]
+
+    columns = [getattr(model, column) for column in FTS_TABLES[fts_table][1]]
+    query = db.session.query(model.id)
+    for term in terms:
+        query = query.filter(db.or_(*(column.ilike(f'%{term}%') for column in columns)))
+    return [row_id for row_id, in query.order_by(model.id).limit(limit)]
+
+# Truncate a timestamp column to the start of its hour or day
+SQLITE_BUCKET_FORMATS = {'hour': '%Y-%m-%d %H:00:00', 'day': '%Y-%m-%d 00:00:00'}
+
+def time_bucket(column, unit):
+    if db.engine.dialect.name == 'sqlite':
+        return db.func.strftime(SQLITE_BUCKET_FORMATS[unit], column)
+    return db.func.date_trunc(unit, column)
+
+# INSERT statement supporting on_conflict_do_update for the configured (or given) database
+def upsert(model, engine=None):
+    dialect = postgresql if (engine or db.engine).dialect.name == 'postgresql' else sqlite
+    return dialect.insert(model)
+
+# Row-wise LEAST/GREATEST (SQLite spells them as multi-argument min/max)
+def sql_least(*values):
+    return db.func.min(*values) if db.engine.dialect.name == 'sqlite' else db.func.least(*values)
+
+def sql_greatest(*values):
+    return db.func.max(*values) if db.engine.dialect.name == 'sqlite' else db.func.greatest(*values)
+
+# Roll raw logs older than retention_days into LogHourly counts and delete them
+def compact_logs(retention_days):
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    hour = time_bucket(Log.timestamp, 'hour')
+    with db.engine.begin() as connection:
+        counts = connection.execute(
+            db.select(hour, Log.action, db.func.count())
+            .where(Log.timestamp < cutoff)
+            .group_by(hour, Log.action)
+        ).all()
+        for bucket, action, count in counts:
+            if isinstance(bucket, str):
+                bucket = datetime.fromisoformat(bucket)
+            updated = connection.execute(
+                db.update(LogHourly)
+                .where(LogHourly.hour == bucket, LogHourly.action == action)
+                .values(count=LogHourly.count + count)
+            )
+            if not updated.rowcount:
+                connection.execute(db.insert(LogHourly).values(hour=bucket, action=action, count=count))
+        connection.execute(db.delete(Log).where(Log.timestamp < cutoff))
+    return sum(count for _, _, count in counts)
+
+@app.cli.command('compact-logs')
+@click.option('--days', type=int, default=None, help='Retention in days (defaults to LOG_RETENTION_DAYS).')
+def compact_logs_command(days):
+    """Roll old raw logs into hourly per-action counts (run it from cron or another scheduler)."""
+    days = days if days is not None else app.config['LOG_RETENTION_DAYS']
+    if days is None:
+        click.echo('LOG_RETENTION_DAYS is None; all raw logs are kept.')
+        return
+    click.echo(f'Compacted {compact_logs(days)} log rows older than {days} days.')
+
+# Helpers for opaque keyset-pagination cursors over (timestamp, id)
+def encode_cursor(timestamp, row_id):
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+def parse_limit(value, default, maximum):
+    if value is None:
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, maximum)
+
+# ISO 8601 date/datetime query arguments by name, None where not given. Raises
+# ValueError naming the first invalid one, for the handler to answer with 400.
+def parse_dates(*names):
+    dates = {}
+    for name in names:
+        value = request.args.get(name)
+        try:
+            dates[name] = datetime.fromisoformat(value) if value else None
+        except ValueError:
+            raise ValueError(f'{name} must be an ISO 8601 date or datetime')
+    return dates
+
+# Stream an iterable of dicts as a JSON array, or as NDJSON (one object per line)
+def stream_json(items, ndjson=False):
+    def generate():
+        buffer = []
+        first = True
+        if not ndjson:
+            yield '['
+        for item in items:
+            encoded = json.dumps(item)
+            if ndjson:
+                buffer.append(encoded + '\n')
+            else:
+                buffer.append(encoded if first else ',' + encoded)
+            first = False
+            if len(buffer) >= STREAM_CHUNK_ITEMS:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+        if not ndjson:
+            yield ']'
+
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+# Dictionary-encode a column: its distinct values in order of first appearance, and the
+# position of every value among them
+def dictionary_encode(values):
+    positions = {}
+    indices = [positions.setdefault(value, len(positions)) for value in values]
+    return list(positions), indices
+
+# Content coding of a ?format=columnar response: brotli if it is installed and accepted,
+# else gzip if accepted. Other responses are not compressed by the API.
+def columnar_encoding():
+    if request.args.get('format') != 'columnar':
+        return None
+    if brotli is not None and request.accept_encodings['br'] > 0:
+        return 'br'
+    if request.accept_encodings['gzip'] > 0:
+        return 'gzip'
+    return None
+
+# Serialize a columnar payload with orjson (the json module without it), datetimes as
+# ISO strings, compressed per columnar_encoding() once it reaches the configured size
+def columnar_response(payload):
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(',', ':'), default=datetime.isoformat).encode()
+    headers = {'Vary': 'Accept-Encoding'}
+    encoding = columnar_encoding()
+    min_bytes = app.config['COLUMNAR_COMPRESS_MIN_BYTES']
+    if encoding and min_bytes is not None and len(body) >= min_bytes:
+        if encoding == 'br':
+            body = brotli.compress(body, quality=app.config['COLUMNAR_BROTLI_QUALITY'])
+        else:
+            body = gzip.compress(body, compresslevel=app.config['COLUMNAR_GZIP_LEVEL'], mtime=0)
+        headers['Content-Encoding'] = encoding
+    return Response(body, mimetype='application/json', headers=headers)
+
+# Cached responses and ETags are keyed on the stored versions of the collections they
+# read. Every change to a collection, from a request or a CLI command, bumps its
+# version after committing, so no process serves an entry from before the change.
+def bump_version(*collections):
+    statement = upsert(CollectionVersion).values([{'name': collection, 'version': 1} for collection in collections])
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['name'], set_={'version': CollectionVersion.version + 1}
+    ))
     db.session.commit()
 
+def collection_versions(collections):
+    stored = dict(db.session.execute(
+        db.select(CollectionVersion.name, CollectionVersion.version).where(CollectionVersion.name.in_(collections))
+    ).all())
+    return tuple(stored.get(collection, 0) for collection in collections)
+
+# LRU cache of serialized responses
+class ResponseCache:
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype, headers=None):
+        with self.lock:
+            self.entries[key] = (body, mimetype, headers or {})
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def caching_iterable(self, key, iterable, mimetype):
+        # Pass a streamed body through, caching it if it completes under max_bytes
+        parts = []
+        size = 0
+        for part in iterable:
+            yield part
+            if parts is not None:
+                part = part.encode() if isinstance(part, str) else part
+                size += len(part)
+                if size <= self.max_bytes:
+                    parts.append(part)
+                else:
+                    parts = None
+        if parts is not None:
+            self.put(key, b''.join(parts), mimetype)
+
+response_cache = ResponseCache(app.config['RESPONSE_CACHE_SIZE'], app.config['RESPONSE_CACHE_MAX_BYTES'])
+
+# Serve a GET handler from the response cache, answering If-None-Match with 304
+def cached_response(*collections):
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            versions = collection_versions(collections)
+            key = (request.path, tuple(sorted(request.args.items(multi=True))), versions, columnar_encoding())
+            etag = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+            headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+            if request.if_none_match.contains(etag):
+                return Response(status=304, headers=headers)
+
+            cached = response_cache.get(key)
+            if cached is not None:
+                body, mimetype, cached_headers = cached
+                return Response(body, mimetype=mimetype, headers={**cached_headers, **headers})
+
+            response = handler(*args, **kwargs)
+            if not isinstance(response, Response):
+                response = api.make_response(*response) if isinstance(response, tuple) else api.make_response(response, 200)
+            if response.status_code != 200:
+                return response
+            response.headers.update(headers)
+            if response.is_streamed:
+                response.response = response_cache.caching_iterable(key, response.response, response.mimetype)
+            elif len(response.get_data()) <= response_cache.max_bytes:
+                response_cache.put(key, response.get_data(), response.mimetype, {
+                    name: response.headers[name] for name in ('Content-Encoding', 'Vary') if name in response.headers
+                })
+            return response
+        return wrapper
+    return decorator
+
+# Background writer that bulk-inserts Log rows on its own connection, so requests
+# never wait on (or commit through) the audit log
+class LogWriter:
+    def __init__(self, app, flush_interval, batch_size, queue_size):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.failed = 0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, entry):
+        self._start()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        # Drain the queue in batches; callable from any thread
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(Log.__table__.insert(), batch)
+                        bot_entries = [entry for entry in batch if entry['path'] == '/bot']
+                        if bot_entries:
+                            self._beat(connection, max(bot_entries, key=lambda entry: entry['timestamp']))
+            except Exception as e:
+                self.failed += len(batch)
+                self.app.logger.error(f'Failed to write {len(batch)} log entries: {e}')
+            if len(batch) < self.batch_size:
+                return
+
+    def close(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    @staticmethod
+    def _beat(connection, entry):
+        values = {'last_seen': entry['timestamp'], 'last_action': entry['action']}
+        updated = connection.execute(db.update(BotHeartbeat).where(BotHeartbeat.id == 1).values(**values))
+        if not updated.rowcount:
+            connection.execute(db.insert(BotHeartbeat).values(id=1, **values))
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None and not self._stopping.is_set():
+                self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+log_writer = LogWriter(app, app.config['LOG_FLUSH_INTERVAL'], app.config['LOG_BATCH_SIZE'], app.config['LOG_QUEUE_SIZE'])
+atexit.register(log_writer.close)
+
+# Helper function to log actions. Entries are held on the request until
+# after_request knows the real status code, then handed to the log writer.
+def log_action(action, details=None):
+    g.setdefault('log_entries', []).append({
+        'action': action,
+        'details': details,
+        'timestamp': datetime.utcnow(),
+        'ip_address': request.remote_addr,
+        'http_method': request.method,
+        'path': request.path,
+    })
+
+def enqueue_log_entries(status_code):
+    for entry in g.pop('log_entries', []):
+        entry['status_code'] = status_code
+        log_writer.enqueue(entry)
+
 # Logging every request before it is processed
 @app.before_request
 def log_request():
@@ -97,24 +832,212 @@ def log_request():
     elif request.method == 'POST' and request.path == '/bot':
         log_action('POST /bot', details=f"{request.method} {'/results'}")
 
+@app.after_request
+def record_log_status(response):
+    enqueue_log_entries(response.status_code)
+    return response
+
+@app.teardown_request
+def record_failed_log_status(exc):
+    # Entries left here mean the request raised before after_request ran
+    enqueue_log_entries(500)
+
+# Cumulative Prometheus-style histogram per label set
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        series = self.series.setdefault(labels, [0] * len(self.buckets) + [0, 0])
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, label_names):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self.series.items()):
+            label_text = ','.join(f'{name}="{metric_label(value)}"' for name, value in zip(label_names, labels))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series[-2]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series[-1]}')
+        return lines
+
+def metric_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# In-memory request metrics, labelled by endpoint (the matched URL rule) and method
+class RequestMetrics:
+    LABELS = ('endpoint', 'method')
+
+    def __init__(self, duration_buckets):
+        self.lock = threading.Lock()
+        self.requests = Counter()  # (endpoint, method, status) -> count
+        self.duration = Histogram('http_request_duration_seconds', 'Wall time of requests, including streamed bodies.', duration_buckets)
+        self.sql_statements = Histogram('http_request_sql_statements', 'SQL statements executed per request.', (0, 1, 2, 5, 10, 20, 50, 100, 500))
+        self.sql_duration = Histogram('http_request_sql_duration_seconds', 'Time spent in SQL statements per request.', duration_buckets)
+        self.response_size = Histogram('http_response_size_bytes', 'Size of response bodies.', (100, 1000, 10000, 100000, 1000000, 10000000))
+
+    def observe(self, endpoint, method, status, duration, statements, sql_seconds, size):
+        labels = (endpoint, method)
+        with self.lock:
+            self.requests[(endpoint, method, status)] += 1
+            self.duration.observe(labels, duration)
+            self.sql_statements.observe(labels, statements)
+            self.sql_duration.observe(labels, sql_seconds)
+            self.response_size.observe(labels, size)
+
+    def render(self):
+        with self.lock:
+            lines = ['# HELP http_requests_total Requests by endpoint, method and status code.', '# TYPE http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{endpoint="{metric_label(endpoint)}",method="{method}",status="{status}"}} {count}'
+                )
+            for histogram in (self.duration, self.sql_statements, self.sql_duration, self.response_size):
+                lines.extend(histogram.render(self.LABELS))
+        gauges = (
+            ('response_cache_hits_total', 'counter', 'Responses served from the response cache.', response_cache.hits),
+            ('response_cache_misses_total', 'counter', 'Cacheable responses that had to be built.', response_cache.misses),
+            ('log_writer_queued', 'gauge', 'Audit log entries waiting to be written.', log_writer.queue.qsize()),
+            ('log_writer_dropped_total', 'counter', 'Audit log entries dropped because the queue was full.', log_writer.dropped),
+            ('log_writer_failed_total', 'counter', 'Audit log entries that failed to be written.', log_writer.failed),
+        )
+        for name, kind, description, value in gauges:
+            lines.extend((f'# HELP {name} {description}', f'# TYPE {name} {kind}', f'{name} {value}'))
+        return '\n'.join(lines) + '\n'
+
+request_metrics = RequestMetrics(app.config['METRICS_DURATION_BUCKETS'])
+
+def request_endpoint():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+# Types of a statement's bound parameters, with runs of one type collapsed (e.g. an IN list)
+def parameter_shape(parameters, executemany=False):
+    if executemany:
+        return f'{len(parameters)} x {parameter_shape(parameters[0])}' if parameters else '[]'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in parameters.items()) + '}'
+    runs = []
+    for value in parameters or ():
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return '(' + ', '.join(name if count == 1 else f'{name} x {count}' for name, count in runs) + ')'
+
+def start_statement_timer(connection, cursor, statement, parameters, context, executemany):
+    connection.info.setdefault('statement_started', []).append(time.perf_counter())
+
+def record_statement(connection, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - connection.info['statement_started'].pop()
+    in_request = has_request_context() and 'request_stats' in g
+    if in_request:
+        g.request_stats['statements'] += 1
+        g.request_stats['sql_seconds'] += elapsed
+    threshold = app.config['SLOW_QUERY_THRESHOLD']
+    if threshold is not None and elapsed >= threshold:
+        endpoint = f'{request.method} {request_endpoint()}' if in_request else 'background'
+        app.logger.warning(
+            'Slow query (%.1f ms) on %s: %s params %s', elapsed * 1000, endpoint,
+            ' '.join(statement.split())[:1000], parameter_shape(parameters, executemany),
+        )
+
+def discard_statement_timer(exception_context):
+    started = exception_context.connection.info.get('statement_started') if exception_context.connection else None
+    if started:
+        started.pop()
+
+with app.app_context():
+    for engine in db.engines.values():
+        db.event.listen(engine, 'before_cursor_execute', start_statement_timer)
+        db.event.listen(engine, 'after_cursor_execute', record_statement)
+        db.event.listen(engine, 'handle_error', discard_statement_timer)
+
+@app.before_request
+def start_request_metrics():
+    g.request_stats = {'started': time.perf_counter(), 'statements': 0, 'sql_seconds': 0.0, 'size': 0}
+
+@app.after_request
+def record_request_metrics(response):
+    stats = g.get('request_stats')
+    if stats is None:
+        return response
+    labels = (request_endpoint(), request.method, response.status_code)
+
+    def finish():
+        request_metrics.observe(
+            *labels, time.perf_counter() - stats['started'], stats['statements'], stats['sql_seconds'], stats['size'],
+        )
+
+    if response.is_streamed:
+        # Streamed bodies run their queries after this hook; measure once the body is sent
+        def counting(body):
+            for chunk in body:
+                stats['size'] += len(chunk.encode() if isinstance(chunk, str) else chunk)
+                yield chunk
+
+        response.response = counting(response.response)
+        response.call_on_close(finish)
+    else:
+        stats['size'] = response.calculate_content_length() or 0
+        finish()
+    return response
+
+@app.route('/metrics')
+def metrics():
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # API Resources
 class WebsiteResource(Resource):
+    @cached_response('websites')
     def get(self):
-        websites = Website.query.all()
+        if request.args.get('q'):
+            # Ranked name/domain search
+            try:
+                limit = parse_limit(request.args.get('limit'), SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE)
+            except ValueError:
+                return {'message': 'limit must be a positive integer'}, 400
+            ids = search_ids('website_fts', Website, request.args['q'], limit)
+            websites_by_id = {w.id: w for w in Website.query.filter(Website.id.in_(ids))}
+            websites = [websites_by_id[website_id] for website_id in ids if website_id in websites_by_id]
+        elif request.args.get('page') or request.args.get('limit'):
+            # Optional page/limit mode, ordered by id as in GET /keywords
+            try:
+                page = int(request.args.get('page', 1))
+                limit = parse_limit(request.args.get('limit'), 100, WEBSITES_MAX_PAGE_SIZE)
+                if page < 1:
+                    raise ValueError('page must be positive')
+            except ValueError:
+                return {'message': 'page and limit must be positive integers'}, 400
+            websites = Website.query.order_by(Website.id).limit(limit).offset((page - 1) * limit).all()
+        else:
+            websites = Website.query.all()
         return jsonify([{'id': w.id, 'name': w.name, 'domain': w.domain} for w in websites])
 
     def post(self):
         data = request.json
-        if not data.get('name') or not data.get('domain'):
-            return jsonify({'message': 'Name and domain are required'}), 400
+        if not isinstance(data, dict) or not data.get('name') or not data.get('domain'):
+            return {'message': 'Name and domain are required'}, 400
+        if not isinstance(data['domain'], str) or not normalize_host(data['domain']):
+            return {'message': 'Domain must be a string naming a host'}, 400
+        data['domain'] = normalize_host(data['domain'])
 
         if Website.query.filter_by(domain=data['domain']).first():
-            return jsonify({'message': 'Website with this domain already exists'}), 400
+            return {'message': 'Website with this domain already exists'}, 400
 
         new_website = Website(name=data['name'], domain=data['domain'])
         try:
             db.session.add(new_website)
             db.session.commit()
+            bump_version('websites')
             log_action('Add Website', f"Website '{data['domain']}' added.")
             return jsonify({'message': 'Website added successfully', 'website': {'id': new_website.id, 'name': new_website.name, 'domain': new_website.domain}})
         except Exception as e:
@@ -130,35 +1053,41 @@ class WebsiteResource(Resource):
         website = Website.query.get(data['id'])
         if website:
             try:
-                # Delete the website and its associations
+                # Delete the website, its associations and its results (hot and archived)
                 for keyword in website.keywords:
                     website.keywords.remove(keyword)
 
+                delete_website_results(website.id)
                 db.session.delete(website)
                 db.session.commit()
+                bump_version('websites', 'results')
                 log_action('Delete Website', f"Website '{website.domain}' deleted.")
                 return jsonify({'message': 'Website deleted successfully'})
             except Exception as e:
                 db.session.rollback()
                 log_action('Delete Website Error', str(e))
-                return jsonify({'error': str(e)}), 500
+                return {'error': str(e)}, 500
 
         return jsonify({'message': 'Website not found'}), 404
 
     def put(self):
         data = request.json
-        if not data.get('id') or not data.get('name') or not data.get('domain'):
-            return jsonify({'message': 'ID, name, and domain are required'}), 400
+        if not isinstance(data, dict) or not data.get('id') or not data.get('name') or not data.get('domain'):
+            return {'message': 'ID, name, and domain are required'}, 400
+        if not isinstance(data['domain'], str) or not normalize_host(data['domain']):
+            return {'message': 'Domain must be a string naming a host'}, 400
+        data['domain'] = normalize_host(data['domain'])
 
         website = Website.query.get(data['id'])
         if website:
             if Website.query.filter(Website.domain == data['domain'], Website.id != data['id']).first():
-                return jsonify({'message': 'Another website with this domain already exists'}), 400
+                return {'message': 'Another website with this domain already exists'}, 400
 
             website.name = data['name']
             website.domain = data['domain']
             try:
                 db.session.commit()
+                bump_version('websites')
                 log_action('Update Website', f"Website '{website.domain}' updated.")
                 return jsonify({'message': 'Website updated successfully'})
             except Exception as e:
@@ -169,10 +1098,112 @@ class WebsiteResource(Resource):
         return jsonify({'message': 'Website not found'}), 404
 
 
+# (keyword id, keyword, website id, name, domain) rows of one keyword/keyword_website/website
+# join, grouped by keyword; website columns are None for a keyword without websites
+def keyword_website_rows(keyword_ids, connection=None):
+    rows = (connection or db.session).execute(
+        db.select(Keyword.id, Keyword.keyword, Website.id, Website.name, Website.domain)
+        .outerjoin(keyword_website, keyword_website.c.keyword_id == Keyword.id)
+        .outerjoin(Website, Website.id == keyword_website.c.website_id)
+        .where(Keyword.id.in_(keyword_ids.scalar_subquery()))
+        .order_by(Keyword.id, Website.id),
+        execution_options={'yield_per': STREAM_FETCH_SIZE},
+    )
+    return groupby(rows, key=lambda row: (row[0], row[1]))
+
+# Build keyword dicts with their websites from one keyword/keyword_website/website join
+def keywords_with_websites(keyword_ids, connection=None):
+    for (keyword_id, keyword_text), group in keyword_website_rows(keyword_ids, connection):
+        yield {
+            'id': keyword_id,
+            'keyword': keyword_text,
+            'websites': [{'id': row[2], 'name': row[3], 'domain': row[4]} for row in group if row[2] is not None],
+        }
+
+
+# The same join as columns for ?format=columnar: id, keyword and the positions of each
+# keyword's websites in the website lookup table. order lists keyword ids to sort by.
+def keywords_columnar(keyword_ids, order=None):
+    keywords = []
+    website_positions = {}
+    websites = {'id': [], 'name': [], 'domain': []}
+    for (keyword_id, keyword_text), group in keyword_website_rows(keyword_ids):
+        positions = []
+        for _, _, website_id, name, domain in group:
+            if website_id is None:
+                continue
+            if website_id not in website_positions:
+                website_positions[website_id] = len(website_positions)
+                websites['id'].append(website_id)
+                websites['name'].append(name)
+                websites['domain'].append(domain)
+            positions.append(website_positions[website_id])
+        keywords.append((keyword_id, keyword_text, positions))
+    if order is not None:
+        rank = {keyword_id: index for index, keyword_id in enumerate(order)}
+        keywords.sort(key=lambda keyword: rank[keyword[0]])
+    return {
+        'rows': len(keywords),
+        'columns': {
+            'id': [keyword[0] for keyword in keywords],
+            'keyword': [keyword[1] for keyword in keywords],
+            'websites': [keyword[2] for keyword in keywords],
+        },
+        'dictionaries': {'website': websites},
+    }
+
+class KeywordDueResource(Resource):
+    def post(self):
+        # Keywords due for a check, stalest first, leased to the caller so that
+        # overlapping bot runs are never handed the same keyword. Ingesting results
+        # for a keyword ends its lease; otherwise it is due again once the lease expires.
+        # A request repeating the lease_token of a lease still held gets that lease back,
+        # so a retry after a lost response does not lease a second batch.
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return {'message': 'Request body must be a JSON object'}, 400
+        try:
+            limit = parse_limit(data.get('limit'), DUE_KEYWORDS_PAGE_SIZE, DUE_KEYWORDS_MAX_PAGE_SIZE)
+        except (ValueError, TypeError):
+            return {'message': 'limit must be a positive integer'}, 400
+        token = data.get('lease_token')
+        if token is not None and not (isinstance(token, str) and LEASE_TOKEN_PATTERN.fullmatch(token)):
+            return {'message': 'lease_token must be 1 to 32 letters, digits, "-" or "_"'}, 400
+        keywords, expires_at, token = lease_due_keywords(limit, token)
+        return {'lease_token': token, 'lease_expires_at': expires_at.isoformat(), 'keywords': keywords}, 200
+
 class KeywordResource(Resource):
+    @cached_response('keywords', 'websites')
     def get(self):
-        keywords = Keyword.query.all()
-        return jsonify([{'id': k.id, 'keyword': k.keyword, 'websites': [{'id': w.id, 'name': w.name, 'domain': w.domain} for w in k.websites]} for k in keywords])
+        # Optional page/limit mode; without it every keyword is streamed.
+        # ?format=ndjson streams one keyword object per line instead of a JSON array;
+        # ?format=columnar returns column arrays (see keywords_columnar) in one body.
+        if request.args.get('q'):
+            # Ranked keyword search
+            try:
+                limit = parse_limit(request.args.get('limit'), SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE)
+            except ValueError:
+                return {'message': 'limit must be a positive integer'}, 400
+            ids = search_ids('keyword_fts', Keyword, request.args['q'], limit)
+            if request.args.get('format') == 'columnar':
+                return columnar_response(keywords_columnar(db.session.query(Keyword.id).filter(Keyword.id.in_(ids)), order=ids))
+            keywords_by_id = {k['id']: k for k in keywords_with_websites(db.session.query(Keyword.id).filter(Keyword.id.in_(ids)))}
+            return jsonify([keywords_by_id[keyword_id] for keyword_id in ids if keyword_id in keywords_by_id])
+
+        keyword_ids = db.session.query(Keyword.id)
+        if request.args.get('page') or request.args.get('limit'):
+            try:
+                page = int(request.args.get('page', 1))
+                limit = parse_limit(request.args.get('limit'), 100, KEYWORDS_MAX_PAGE_SIZE)
+                if page < 1:
+                    raise ValueError('page must be positive')
+            except ValueError:
+                return {'message': 'page and limit must be positive integers'}, 400
+            keyword_ids = keyword_ids.order_by(Keyword.id).limit(limit).offset((page - 1) * limit)
+
+        if request.args.get('format') == 'columnar':
+            return columnar_response(keywords_columnar(keyword_ids))
+        return stream_json(keywords_with_websites(keyword_ids), ndjson=request.args.get('format') == 'ndjson')
 
     def post(self):
         data = request.json
@@ -189,7 +1220,10 @@ class KeywordResource(Resource):
                 new_keyword.websites.append(site)
         try:
             db.session.add(new_keyword)
+            db.session.flush()
+            schedule_keywords([new_keyword.id])
             db.session.commit()
+            bump_version('keywords')
             log_action('Add Keyword', f"Keyword '{data['keyword']}' added.")
             return jsonify({'message': 'Keyword added successfully', 'keyword': {'id': new_keyword.id, 'keyword': new_keyword.keyword}})
         except Exception as e:
@@ -209,16 +1243,19 @@ class KeywordResource(Resource):
                 for website in keyword.websites:
                     keyword.websites.remove(website)
 
-                # Delete the keyword itself
+                # Delete the keyword itself, its schedule and its results (hot and archived)
+                db.session.execute(db.delete(KeywordSchedule).where(KeywordSchedule.keyword_id == keyword.id))
+                delete_keyword_results(keyword.id)
                 db.session.delete(keyword)
                 db.session.commit()
+                bump_version('keywords', 'results')
 
                 log_action('Delete Keyword', f"Keyword '{keyword.keyword}' deleted.")
                 return jsonify({'message': 'Keyword deleted successfully'})
             except Exception as e:
                 db.session.rollback()
                 log_action('Delete Keyword Error', str(e))
-                return jsonify({'error': str(e)}), 500
+                return {'error': str(e)}, 500
 
         return jsonify({'message': 'Keyword not found'}), 404
 
@@ -242,6 +1279,7 @@ class KeywordResource(Resource):
 
             try:
                 db.session.commit()
+                bump_version('keywords')
                 log_action('Update Keyword', f"Keyword '{keyword.keyword}' updated.")
                 return jsonify({'message': 'Keyword updated successfully'})
             except Exception as e:
@@ -252,69 +1290,962 @@ class KeywordResource(Resource):
         return jsonify({'message': 'Keyword not found'}), 404
 
 
-class ExcelUploadResource(Resource):
+# Read the item list of a bulk request body ({"<key>": [...]} or a bare list)
+def bulk_items(data, key):
+    items = data.get(key) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return None, ({'message': f'A non-empty list of {key} is required'}, 400)
+    if len(items) > BULK_MAX_SIZE:
+        return None, ({'message': f'At most {BULK_MAX_SIZE} {key} can be sent in one request'}, 400)
+    return items, None
+
+# Ids of the stored websites matching the given domains, keyed by each domain as given
+def website_ids_by_domain(domains):
+    hosts = {domain: normalize_host(domain) for domain in domains}
+    stored = dict(db.session.query(Website.domain, Website.id).filter(Website.domain.in_(set(hosts.values()))))
+    return {domain: stored[host] for domain, host in hosts.items() if host in stored}
+
+class WebsiteBulkResource(Resource):
     def post(self):
-        if 'file' not in request.files:
-            return jsonify({'message': 'No file part'}), 400
+        # Upsert websites by domain
+        items, error = bulk_items(request.json, 'websites')
+        if error:
+            return error
+
+        valid = {}
+        statuses = []
+        for index, item in enumerate(items):
+            domain = normalize_host(item['domain']) if isinstance(item, dict) and isinstance(item.get('domain'), str) else ''
+            if not domain or not isinstance(item.get('name'), str) or not item['name']:
+                statuses.append({'index': index, 'status': 'error', 'message': 'Name and domain are required'})
+            elif domain in valid:
+                statuses.append({'index': index, 'status': 'error', 'message': 'Duplicate domain in request'})
+            else:
+                valid[domain] = item['name']
+                statuses.append({'index': index, 'domain': domain})
+
+        existing = {w.domain: w for w in Website.query.filter(Website.domain.in_(valid))}
+        inserts = [{'name': name, 'domain': domain} for domain, name in valid.items() if domain not in existing]
+        updated_domains = {domain for domain, name in valid.items() if domain in existing and existing[domain].name != name}
+        updates = [{'id': existing[domain].id, 'name': valid[domain]} for domain in updated_domains]
 
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'message': 'No selected file'}), 400
+        try:
+            if inserts:
+                db.session.execute(db.insert(Website), inserts)
+            if updates:
+                db.session.execute(db.update(Website), updates)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_action('Bulk Websites Error', str(e))
+            return {'error': str(e)}, 500
 
-        if file and file.filename.endswith('.xlsx'):
-            try:
-                wb = openpyxl.load_workbook(file)
-                sheet = wb.active
+        ids = dict(db.session.query(Website.domain, Website.id).filter(Website.domain.in_(valid)))
+        for status in statuses:
+            domain = status.get('domain')
+            if domain is not None:
+                status['id'] = ids[domain]
+                status['status'] = 'updated' if domain in updated_domains else 'unchanged' if domain in existing else 'created'
 
-                for row in sheet.iter_rows(min_row=2, values_only=True):
-                    keyword_text = row[0]
-                    website_domains = row[1].split(',')
+        bump_version('websites')
+        log_action('Bulk Websites', f'{len(inserts)} websites added, {len(updates)} updated.')
+        return {'created': len(inserts), 'updated': len(updates), 'items': statuses}, 200
 
-                    keyword = Keyword.query.filter_by(keyword=keyword_text).first()
-                    if not keyword:
-                        keyword = Keyword(keyword=keyword_text)
+class KeywordBulkResource(Resource):
+    def post(self):
+        # Upsert keywords by text and replace each keyword's websites with the given
+        # website_ids and/or domains
+        items, error = bulk_items(request.json, 'keywords')
+        if error:
+            return error
+
+        domains = {domain for item in items if isinstance(item, dict) and isinstance(item.get('domains'), list)
+                   for domain in item['domains'] if isinstance(domain, str)}
+        website_ids = {website_id for item in items if isinstance(item, dict) and isinstance(item.get('website_ids'), list)
+                       for website_id in item['website_ids'] if isinstance(website_id, int)}
+        domain_ids = website_ids_by_domain(domains)
+        known_ids = {website_id for website_id, in db.session.query(Website.id).filter(Website.id.in_(website_ids))}
+
+        desired = {}
+        statuses = []
+        for index, item in enumerate(items):
+            status = {'index': index}
+            statuses.append(status)
+            if not isinstance(item, dict) or not isinstance(item.get('keyword'), str) or not item['keyword']:
+                status.update(status='error', message='Keyword is required')
+                continue
+            if item['keyword'] in desired:
+                status.update(status='error', message='Duplicate keyword in request')
+                continue
+            requested_domains = item.get('domains') or []
+            requested_ids = item.get('website_ids') or []
+            if not isinstance(requested_domains, list) or not all(isinstance(domain, str) for domain in requested_domains):
+                status.update(status='error', message='domains must be a list of strings')
+                continue
+            if not isinstance(requested_ids, list) or not all(
+                isinstance(website_id, int) and not isinstance(website_id, bool) for website_id in requested_ids
+            ):
+                status.update(status='error', message='website_ids must be a list of integers')
+                continue
+            missing = [domain for domain in requested_domains if domain not in domain_ids] + \
+                      [website_id for website_id in requested_ids if website_id not in known_ids]
+            if missing:
+                status.update(status='error', message=f'Websites not found: {missing}')
+                continue
+            desired[item['keyword']] = {domain_ids[domain] for domain in requested_domains} | set(requested_ids)
+            status['keyword'] = item['keyword']
 
-                    for domain in website_domains:
-                        website = Website.query.filter_by(domain=domain.strip()).first()
-                        if website and website not in keyword.websites:
-                            keyword.websites.append(website)
+        try:
+            existing = dict(db.session.query(Keyword.keyword, Keyword.id).filter(Keyword.keyword.in_(desired)))
+            new_keywords = [text for text in desired if text not in existing]
+            if new_keywords:
+                db.session.execute(db.insert(Keyword), [{'keyword': text} for text in new_keywords])
+            keyword_ids = dict(db.session.query(Keyword.keyword, Keyword.id).filter(Keyword.keyword.in_(desired)))
+            if new_keywords:
+                schedule_keywords([keyword_ids[text] for text in new_keywords])
+
+            # Set difference between the stored and requested links, applied with
+            # one executemany INSERT and one executemany DELETE
+            current = set(
+                db.session.query(keyword_website.c.keyword_id, keyword_website.c.website_id)
+                .filter(keyword_website.c.keyword_id.in_(keyword_ids.values()))
+            )
+            wanted = {(keyword_ids[text], website_id) for text, ids in desired.items() for website_id in ids}
+            added = wanted - current
+            removed = current - wanted
+            if added:
+                db.session.execute(
+                    keyword_website.insert(),
+                    [{'keyword_id': keyword_id, 'website_id': website_id} for keyword_id, website_id in added],
+                )
+            if removed:
+                db.session.execute(
+                    keyword_website.delete().where(
+                        keyword_website.c.keyword_id == db.bindparam('k'),
+                        keyword_website.c.website_id == db.bindparam('w'),
+                    ),
+                    [{'k': keyword_id, 'w': website_id} for keyword_id, website_id in removed],
+                )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log_action('Bulk Keywords Error', str(e))
+            return {'error': str(e)}, 500
 
-                    db.session.add(keyword)
-                    db.session.flush()  # Incrementally commit changes to avoid memory overflow
+        added_counts = Counter(keyword_id for keyword_id, _ in added)
+        removed_counts = Counter(keyword_id for keyword_id, _ in removed)
+        for status in statuses:
+            text = status.get('keyword')
+            if text is None:
+                continue
+            keyword_id = keyword_ids[text]
+            status['id'] = keyword_id
+            status['added'] = added_counts[keyword_id]
+            status['removed'] = removed_counts[keyword_id]
+            status['status'] = 'created' if text not in existing else 'updated' if status['added'] or status['removed'] else 'unchanged'
+
+        bump_version('keywords')
+        log_action('Bulk Keywords', f'{len(new_keywords)} keywords added, {len(added)} links added, {len(removed)} links removed.')
+        return {
+            'created': len(new_keywords),
+            'links_added': len(added),
+            'links_removed': len(removed),
+            'items': statuses,
+        }, 200
+
+# Excel imports run one at a time off the request thread
+import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='excel-import')
+
+# Stream an uploaded workbook (keyword in column A, comma-separated domains in
+# column B) into keywords and keyword_website rows, one chunk per transaction
+def run_excel_import(job_id, path):
+    with app.app_context():
+        job = db.session.get(ImportJob, job_id)
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+        errors = []
 
-                db.session.commit()
-                log_action('Upload Excel', 'Keywords and websites uploaded successfully.')
-                return jsonify({'message': 'File uploaded and data processed successfully'})
-            except Exception as e:
-                db.session.rollback()
-                log_action('Excel Upload Error', str(e))
-                return jsonify({'error': str(e)}), 500
+        def add_error(row_number, message):
+            job.error_count += 1
+            if len(errors) < IMPORT_MAX_ERRORS:
+                errors.append({'row': row_number, 'message': message})
+
+        try:
+            website_ids = dict(db.session.query(Website.domain, Website.id))
+            keyword_ids = dict(db.session.query(Keyword.keyword, Keyword.id))
+
+            workbook = openpyxl.load_workbook(path, read_only=True)
+            try:
+                rows = enumerate(workbook.active.iter_rows(min_row=2, values_only=True), start=2)
+                while True:
+                    chunk = [row for _, row in zip(range(IMPORT_CHUNK_SIZE), rows)]
+                    if not chunk:
+                        break
+
+                    pairs = []
+                    new_keywords = set()
+                    for row_number, row in chunk:
+                        keyword_text = str(row[0]).strip() if row and row[0] is not None else ''
+                        if not keyword_text:
+                            add_error(row_number, 'Keyword is required')
+                            continue
+                        domains = str(row[1]).split(',') if len(row) > 1 and row[1] is not None else []
+                        for domain in filter(None, (domain.strip() for domain in domains)):
+                            if normalize_host(domain) in website_ids:
+                                pairs.append((keyword_text, website_ids[normalize_host(domain)]))
+                            else:
+                                add_error(row_number, f"Website '{domain}' not found")
+                        if keyword_text not in keyword_ids:
+                            new_keywords.add(keyword_text)
+
+                    if new_keywords:
+                        db.session.execute(db.insert(Keyword), [{'keyword': text} for text in new_keywords])
+                        keyword_ids.update(db.session.query(Keyword.keyword, Keyword.id).filter(Keyword.keyword.in_(new_keywords)))
+                        schedule_keywords([keyword_ids[text] for text in new_keywords])
+                        job.keywords_created += len(new_keywords)
+
+                    links = {(keyword_ids[text], website_id) for text, website_id in pairs}
+                    if links:
+                        db.session.execute(
+                            upsert(keyword_website).on_conflict_do_nothing(),
+                            [{'keyword_id': keyword_id, 'website_id': website_id} for keyword_id, website_id in links],
+                        )
+
+                    job.rows_done += len(chunk)
+                    job.errors = list(errors)
+                    db.session.commit()
+                    bump_version('keywords')
+            finally:
+                workbook.close()
+
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(ImportJob, job_id)
+            job.status = 'failed'
+            add_error(None, str(e))
+            job.errors = list(errors)
+        finally:
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            db.session.remove()
+            os.remove(path)
 
-        return jsonify({'message': 'Invalid file format. Only .xlsx files are supported.'}), 400
+class ExcelUploadResource(Resource):
+    def post(self):
+        if 'file' not in request.files:
+            return {'message': 'No file part'}, 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return {'message': 'No selected file'}, 400
+
+        if not file.filename.endswith('.xlsx'):
+            return {'message': 'Invalid file format. Only .xlsx files are supported.'}, 400
+
+        # Spool the upload to disk so the import can outlive the request
+        handle, path = tempfile.mkstemp(suffix='.xlsx')
+        with os.fdopen(handle, 'wb') as spooled:
+            file.save(spooled)
+
+        job = ImportJob(filename=file.filename)
+        db.session.add(job)
+        db.session.commit()
+        import_executor.submit(run_excel_import, job.id, path)
+        log_action('Upload Excel', f"Import job {job.id} queued for '{file.filename}'.")
+        return {'message': 'File accepted for import', 'job_id': job.id}, 202
+
+class ImportJobResource(Resource):
+    def get(self, job_id):
+        job = db.session.get(ImportJob, job_id)
+        if not job:
+            return {'message': 'Import job not found'}, 404
+
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds() if job.started_at else 0
+        return {
+            'id': job.id,
+            'filename': job.filename,
+            'status': job.status,
+            'rows_done': job.rows_done,
+            'keywords_created': job.keywords_created,
+            'error_count': job.error_count,
+            'errors': job.errors,
+            'rows_per_second': job.rows_done / elapsed if elapsed > 0 else None,
+            'created_at': job.created_at.isoformat(),
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }, 200
 
 class LogsResource(Resource):
     def get(self):
-        logs = Log.query.order_by(Log.timestamp.desc()).all()
-        return jsonify([
-            {
-                'id': log.id,
-                'action': log.action,
-                'details': log.details,
-                'timestamp': log.timestamp,
-                'ip_address': log.ip_address,
-                'http_method': log.http_method,
-                'path': log.path,
-                'status_code': log.status_code
+        # Newest logs first, one page at a time; pass next_cursor back as ?cursor=
+        try:
+            limit = parse_limit(request.args.get('limit'), LOGS_PAGE_SIZE, LOGS_MAX_PAGE_SIZE)
+        except ValueError:
+            return {'message': 'limit must be a positive integer'}, 400
+        try:
+            dates = parse_dates('start_date', 'end_date')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        query = Log.query
+        if request.args.get('action'):
+            query = query.filter(Log.action == request.args['action'])
+        if request.args.get('path'):
+            query = query.filter(Log.path == request.args['path'])
+        if request.args.get('ip'):
+            query = query.filter(Log.ip_address == request.args['ip'])
+        if dates['start_date']:
+            query = query.filter(Log.timestamp >= dates['start_date'])
+        if dates['end_date']:
+            query = query.filter(Log.timestamp <= dates['end_date'])
+
+        if request.args.get('cursor'):
+            try:
+                cursor_timestamp, cursor_id = decode_cursor(request.args['cursor'])
+            except ValueError:
+                return {'message': 'Invalid cursor'}, 400
+            query = query.filter(db.or_(
+                Log.timestamp < cursor_timestamp,
+                db.and_(Log.timestamp == cursor_timestamp, Log.id < cursor_id),
+            ))
+
+        logs = query.order_by(Log.timestamp.desc(), Log.id.desc()).limit(limit + 1).all()
+        has_more = len(logs) > limit
+        logs = logs[:limit]
+        next_cursor = encode_cursor(logs[-1].timestamp, logs[-1].id) if has_more else None
+
+        if request.args.get('format') == 'columnar':
+            # action, http_method and path repeat across rows: they index into lookup tables
+            columns = {
+                name: [getattr(log, name) for log in logs]
+                for name in ('id', 'details', 'timestamp', 'ip_address', 'status_code')
             }
-            for log in logs
+            dictionaries = {}
+            for name in ('action', 'http_method', 'path'):
+                dictionaries[name], columns[name] = dictionary_encode([getattr(log, name) for log in logs])
+            return columnar_response({
+                'rows': len(logs), 'columns': columns, 'dictionaries': dictionaries, 'next_cursor': next_cursor,
+            })
+
+        return {
+            'logs': [
+                {
+                    'id': log.id,
+                    'action': log.action,
+                    'details': log.details,
+                    'timestamp': log.timestamp.isoformat(),
+                    'ip_address': log.ip_address,
+                    'http_method': log.http_method,
+                    'path': log.path,
+                    'status_code': log.status_code
+                }
+                for log in logs
+            ],
+            'next_cursor': next_cursor,
+        }, 200
+
+RESULT_FIELDS = ('keyword', 'domain', 'min_rank', 'max_rank', 'avg_rank', 'suggestions')
+
+# Return an error message for a malformed result (single or batch item), or None when it is valid
+def validate_result(item):
+    if not isinstance(item, dict) or any(field not in item for field in RESULT_FIELDS):
+        return 'Keyword, domain, min_rank, max_rank, avg_rank, and suggestions are required'
+    if not isinstance(item['keyword'], str) or not isinstance(item['domain'], str):
+        return 'Keyword and domain must be strings'
+    if is_unranked(item):
+        return None
+    for field in ('min_rank', 'max_rank', 'avg_rank'):
+        if isinstance(item[field], bool) or not isinstance(item[field], (int, float)):
+            return f'{field} must be a number (or all ranks null when the website was not ranked)'
+    return None
+
+# A result whose ranks are all null: the website was not found in the checked results
+def is_unranked(item):
+    return all(item.get(field) is None for field in ('min_rank', 'max_rank', 'avg_rank'))
+
+# Fold newly inserted result rows into the ResultDaily rollups in the current transaction
+def update_daily_rollups(rows):
+    groups = {}
+    for row in rows:
+        key = (row['keyword_id'], row['website_id'], row['timestamp'].date())
+        group = groups.setdefault(key, {'count': 0, 'best_rank': row['min_rank'], 'worst_rank': row['min_rank'], 'rank_total': 0.0})
+        group['count'] += 1
+        group['best_rank'] = min(group['best_rank'], row['min_rank'])
+        group['worst_rank'] = max(group['worst_rank'], row['min_rank'])
+        group['rank_total'] += row['avg_rank']
+    if not groups:
+        return
+
+    stmt = upsert(ResultDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['keyword_id', 'website_id', 'day'],
+        set_={
+            'count': ResultDaily.count + stmt.excluded.count,
+            'best_rank': sql_least(ResultDaily.best_rank, stmt.excluded.best_rank),
+            'worst_rank': sql_greatest(ResultDaily.worst_rank, stmt.excluded.worst_rank),
+            'avg_rank': (ResultDaily.avg_rank * ResultDaily.count + stmt.excluded.avg_rank * stmt.excluded.count)
+            / (ResultDaily.count + stmt.excluded.count),
+        },
+    )
+    db.session.execute(stmt, [
+        {
+            'keyword_id': keyword_id,
+            'website_id': website_id,
+            'day': day,
+            'count': group['count'],
+            'best_rank': group['best_rank'],
+            'worst_rank': group['worst_rank'],
+            'avg_rank': group['rank_total'] / group['count'],
+        }
+        for (keyword_id, website_id, day), group in groups.items()
+    ])
+
+# Upsert LatestResult for every keyword/website pair in the newly inserted rows
+def update_latest_results(rows):
+    latest = {}
+    for row in sorted(rows, key=lambda row: row['timestamp']):
+        key = (row['keyword_id'], row['website_id'])
+        previous = latest.get(key)
+        latest[key] = dict(
+            row,
+            previous_rank=previous['min_rank'] if previous else None,
+            delta=previous['min_rank'] - row['min_rank'] if previous else None,
+        )
+    if not latest:
+        return
+
+    stmt = upsert(LatestResult)
+    # A pair seen earlier in the same batch already knows its previous rank;
+    # otherwise the stored row is the previous result
+    previous_rank = db.func.coalesce(stmt.excluded.previous_rank, LatestResult.min_rank)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['keyword_id', 'website_id'],
+        set_={
+            'min_rank': stmt.excluded.min_rank,
+            'max_rank': stmt.excluded.max_rank,
+            'avg_rank': stmt.excluded.avg_rank,
+            'previous_rank': previous_rank,
+            'delta': previous_rank - stmt.excluded.min_rank,
+            'timestamp': stmt.excluded.timestamp,
+        },
+    )
+    db.session.execute(stmt, [
+        {
+            'keyword_id': row['keyword_id'],
+            'website_id': row['website_id'],
+            'min_rank': row['min_rank'],
+            'max_rank': row['max_rank'],
+            'avg_rank': row['avg_rank'],
+            'previous_rank': row['previous_rank'],
+            'delta': row['delta'],
+            'timestamp': row['timestamp'],
+        }
+        for row in latest.values()
+    ])
+
+# Suggestion texts from a result payload (a list, or a dict of lists)
+def suggestion_texts(suggestions):
+    if isinstance(suggestions, dict):
+        suggestions = [text for values in suggestions.values() if isinstance(values, list) for text in values]
+    if not isinstance(suggestions, list):
+        return []
+    return [text.strip()[:255] for text in suggestions if isinstance(text, str) and text.strip()]
+
+# What Result.suggestions stores for a payload
+def result_suggestions_blob(suggestions):
+    return suggestions if app.config['KEEP_RESULT_SUGGESTIONS'] else None
+
+# Intern the suggestions of newly inserted rows and record them against their keywords.
+# count is the number of checks a suggestion was seen in: a check stores one row per
+# tracked website, all with the same keyword and timestamp, and counts once.
+def update_suggestions(rows):
+    seen = {}
+    checks = set()
+    for row in rows:
+        for text in suggestion_texts(row['suggestions']):
+            key = (row['keyword_id'], text)
+            first_seen, last_seen, count = seen.get(key, (row['timestamp'], row['timestamp'], 0))
+            if (key, row['timestamp']) not in checks:
+                checks.add((key, row['timestamp']))
+                count += 1
+            seen[key] = (min(first_seen, row['timestamp']), max(last_seen, row['timestamp']), count)
+    if not seen:
+        return
+
+    texts = {text for _, text in seen}
+    db.session.execute(
+        upsert(Suggestion).on_conflict_do_nothing(),
+        [{'text': text, 'search_text': text.lower()} for text in texts],
+    )
+    suggestion_ids = dict(db.session.query(Suggestion.text, Suggestion.id).filter(Suggestion.text.in_(texts)))
+
+    stmt = upsert(KeywordSuggestion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['keyword_id', 'suggestion_id'],
+        set_={
+            'first_seen': sql_least(KeywordSuggestion.first_seen, stmt.excluded.first_seen),
+            'last_seen': sql_greatest(KeywordSuggestion.last_seen, stmt.excluded.last_seen),
+            'count': KeywordSuggestion.count + stmt.excluded.count,
+        },
+    )
+    db.session.execute(stmt, [
+        {
+            'keyword_id': keyword_id,
+            'suggestion_id': suggestion_ids[text],
+            'first_seen': first_seen,
+            'last_seen': last_seen,
+            'count': count,
+        }
+        for (keyword_id, text), (first_seen, last_seen, count) in seen.items()
+    ])
+
+# Give new keywords a schedule row, due at once
+def schedule_keywords(keyword_ids):
+    db.session.execute(upsert(KeywordSchedule).on_conflict_do_nothing(), [
+        {'keyword_id': keyword_id, 'next_due_at': NEVER_CHECKED, 'check_count': 0} for keyword_id in sorted(keyword_ids)
+    ])
+
+# Record a check of each keyword: count it, release its lease and make it due again
+# KEYWORD_CHECK_INTERVAL after checked_at. checks holds (keyword id, lease token)
+# pairs, the token being the one the results were sent under, or None. A leased check
+# is recorded once, while the keyword still holds that lease: recording it releases the
+# lease, so a retried upload or the rest of a split one no longer matches. Returns the
+# ids of the keywords whose check was recorded.
+def update_keyword_schedule(checks, checked_at):
+    recorded = {keyword_id for keyword_id, token in checks if token is None}
+    leased = {(keyword_id, token) for keyword_id, token in checks if token is not None}
+    if leased:
+        recorded.update(
+            keyword_id for keyword_id, token in db.session.execute(
+                db.select(KeywordSchedule.keyword_id, KeywordSchedule.lease_token)
+                .where(KeywordSchedule.keyword_id.in_({keyword_id for keyword_id, _ in leased}))
+                .with_for_update()
+            ) if (keyword_id, token) in leased
+        )
+    if not recorded:
+        return recorded
+    next_due_at = checked_at + timedelta(seconds=app.config['KEYWORD_CHECK_INTERVAL'])
+    stmt = upsert(KeywordSchedule)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['keyword_id'],
+        set_={
+            'next_due_at': stmt.excluded.next_due_at,
+            'check_count': KeywordSchedule.check_count + 1,
+            'last_checked_at': stmt.excluded.last_checked_at,
+            'lease_token': None,
+        },
+    )
+    db.session.execute(stmt, [
+        {'keyword_id': keyword_id, 'next_due_at': next_due_at, 'check_count': 1, 'last_checked_at': checked_at, 'lease_token': None}
+        for keyword_id in sorted(recorded)
+    ])
+    return recorded
+
+# Lease up to limit due keywords that have websites to check, stalest first, under
+# token (a new one if None), and return them (as keywords_with_websites, plus
+# check_count and last_checked_at) with the lease expiry and token. One UPDATE picks
+# the due keywords from the next_due_at index and leases them, re-checking next_due_at,
+# so two concurrent callers never share a keyword. It leases nothing while token
+# already holds an unexpired lease, which is then returned as it is.
+def lease_due_keywords(limit, token=None):
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=app.config['KEYWORD_LEASE_SECONDS'])
+    token = token or uuid.uuid4().hex
+    held = db.and_(KeywordSchedule.lease_token == token, KeywordSchedule.next_due_at > now)
+    held_schedule = db.aliased(KeywordSchedule)
+    due_ids = (
+        db.select(KeywordSchedule.keyword_id)
+        .where(
+            KeywordSchedule.next_due_at <= now,
+            db.exists().where(keyword_website.c.keyword_id == KeywordSchedule.keyword_id),
+        )
+        .order_by(KeywordSchedule.next_due_at, KeywordSchedule.keyword_id)
+        .limit(limit)
+    )
+    with db.engine.begin() as connection:
+        connection.execute(
+            db.update(KeywordSchedule)
+            .where(
+                KeywordSchedule.keyword_id.in_(due_ids.scalar_subquery()),
+                KeywordSchedule.next_due_at <= now,
+                ~db.exists().where(held_schedule.lease_token == token, held_schedule.next_due_at > now),
+            )
+            .values(next_due_at=expires_at, lease_token=token)
+        )
+        schedules = {
+            keyword_id: (next_due_at, check_count, last_checked_at)
+            for keyword_id, next_due_at, check_count, last_checked_at in connection.execute(
+                db.select(
+                    KeywordSchedule.keyword_id, KeywordSchedule.next_due_at,
+                    KeywordSchedule.check_count, KeywordSchedule.last_checked_at,
+                )
+                .where(held)
+                .order_by(KeywordSchedule.last_checked_at.asc().nulls_first(), KeywordSchedule.keyword_id)
+            )
+        }
+        if not schedules:
+            return [], expires_at, token
+        leased = db.select(KeywordSchedule.keyword_id).where(held)
+        keywords_by_id = {k['id']: k for k in keywords_with_websites(leased, connection)}
+    return [
+        dict(
+            keywords_by_id[keyword_id],
+            check_count=check_count,
+            last_checked_at=last_checked_at.isoformat() if last_checked_at else None,
+        )
+        for keyword_id, (_, check_count, last_checked_at) in schedules.items() if keyword_id in keywords_by_id
+    ], max(next_due_at for next_due_at, _, _ in schedules.values()), token
+
+# Everything derived from newly inserted results, written in the same transaction.
+# unranked holds the checks' results for websites that were not ranked (keyword_id,
+# suggestions and timestamp), which only add suggestions. With checked_ids, suggestions
+# are only counted for those keywords: the checks recorded now (later uploads of a
+# check carry the same suggestions).
+def update_result_aggregates(rows, checked_ids=None, unranked=()):
+    update_daily_rollups(rows)
+    update_latest_results(rows)
+    checked = [*rows, *unranked]
+    update_suggestions(checked if checked_ids is None else [row for row in checked if row['keyword_id'] in checked_ids])
+
+# Intern the suggestion blobs of results stored before interning on ingest, resuming
+# where the last run stopped, so no result is counted twice; with clear, also drop the
+# blobs of every result
+def backfill_suggestions(clear=False):
+    record_suggestion_backfill_start()
+    progress = db.session.get(SuggestionBackfill, 1)
+    interned = 0
+    while progress.interned_through_id < progress.last_result_id:
+        chunk = (
+            Result.query.with_entities(Result.id, Result.keyword_id, Result.suggestions, Result.timestamp)
+            .filter(
+                Result.id > progress.interned_through_id,
+                Result.id <= progress.last_result_id,
+                Result.suggestions.isnot(None),
+            )
+            .order_by(Result.id)
+            .limit(SUGGESTIONS_BACKFILL_CHUNK_SIZE)
+            .all()
+        )
+        if not chunk:
+            progress.interned_through_id = progress.last_result_id
+            db.session.commit()
+            break
+        update_suggestions([
+            {'keyword_id': keyword_id, 'suggestions': suggestions, 'timestamp': timestamp}
+            for _, keyword_id, suggestions, timestamp in chunk
         ])
+        # Committed with the counts, so an interrupted run resumes after this chunk
+        progress.interned_through_id = chunk[-1][0]
+        db.session.commit()
+        interned += len(chunk)
+    if clear:
+        last_id = 0
+        while True:
+            ids = [
+                row_id for row_id, in Result.query.with_entities(Result.id)
+                .filter(Result.id > last_id, Result.suggestions.isnot(None))
+                .order_by(Result.id)
+                .limit(SUGGESTIONS_BACKFILL_CHUNK_SIZE)
+            ]
+            if not ids:
+                break
+            db.session.execute(db.update(Result).where(Result.id.in_(ids)).values(suggestions=db.null()))
+            db.session.commit()
+            last_id = ids[-1]
+    bump_version('results')
+    return interned
+
+# Rewrite stored website domains into their normalized form. Websites whose normalized
+# domain already belongs to another website are left alone and returned.
+def normalize_stored_domains():
+    websites = Website.query.all()
+    taken = {website.domain for website in websites}
+    changed = 0
+    conflicts = []
+    for website in websites:
+        host = normalize_host(website.domain)
+        if host == website.domain:
+            continue
+        if not host or host in taken:
+            conflicts.append(website.domain)
+            continue
+        taken.discard(website.domain)
+        taken.add(host)
+        website.domain = host
+        changed += 1
+    if changed:
+        db.session.commit()
+        bump_version('websites')
+    return changed, conflicts
+
+@app.cli.command('normalize-domains')
+def normalize_domains_command():
+    """Normalize stored website domains (lowercase, IDNA, no port or leading www.)."""
+    changed, conflicts = normalize_stored_domains()
+    click.echo(f'Normalized {changed} website domains.')
+    for domain in conflicts:
+        click.echo(f"Skipped '{domain}': its normalized form belongs to another website (or is empty).")
+
+@app.cli.command('backfill-suggestions')
+@click.option('--clear', is_flag=True, help='Also remove the lists from the results (cannot be undone).')
+def backfill_suggestions_command(clear):
+    """Intern the suggestion lists of results stored before suggestions were interned on ingest."""
+    if clear and app.config['KEEP_RESULT_SUGGESTIONS']:
+        raise click.UsageError('--clear requires KEEP_RESULT_SUGGESTIONS to be disabled')
+    click.echo(f'Interned suggestions from {backfill_suggestions(clear)} results.')
+
+# Rebuild ResultDaily from the raw Result table. Days already archived keep their
+# rollups, which were checked against the results before they were moved.
+def backfill_daily_rollups():
+    day = db.func.date(Result.timestamp) if db.engine.dialect.name == 'sqlite' else db.cast(Result.timestamp, db.Date)
+    boundary = archive_boundary()
+    db.session.execute(db.delete(ResultDaily).where(ResultDaily.day >= boundary.date()) if boundary else db.delete(ResultDaily))
+    db.session.execute(db.insert(ResultDaily).from_select(
+        ['keyword_id', 'website_id', 'day', 'count', 'best_rank', 'worst_rank', 'avg_rank'],
+        db.select(
+            Result.keyword_id, Result.website_id, day, db.func.count(),
+            db.func.min(Result.min_rank), db.func.max(Result.min_rank), db.func.avg(Result.avg_rank),
+        ).group_by(Result.keyword_id, Result.website_id, day),
+    ))
+    db.session.commit()
+    bump_version('results')
+    return ResultDaily.query.count()
+
+# Rebuild LatestResult from the two most recent results of every pair
+def backfill_latest_results():
+    position = db.func.row_number().over(
+        partition_by=(Result.keyword_id, Result.website_id),
+        order_by=(Result.timestamp.desc(), Result.id.desc()),
+    ).label('position')
+    ranked = db.select(
+        Result.keyword_id, Result.website_id, Result.min_rank, Result.max_rank, Result.avg_rank, Result.timestamp, position,
+    ).subquery()
+    rows = db.session.execute(
+        db.select(ranked).where(ranked.c.position <= 2).order_by(ranked.c.keyword_id, ranked.c.website_id, ranked.c.position)
+    ).mappings()
+
+    latest = []
+    for _, pair_rows in groupby(rows, key=lambda row: (row['keyword_id'], row['website_id'])):
+        current, *previous = pair_rows
+        previous_rank = previous[0]['min_rank'] if previous else None
+        latest.append({
+            'keyword_id': current['keyword_id'],
+            'website_id': current['website_id'],
+            'min_rank': current['min_rank'],
+            'max_rank': current['max_rank'],
+            'avg_rank': current['avg_rank'],
+            'previous_rank': previous_rank,
+            'delta': previous_rank - current['min_rank'] if previous else None,
+            'timestamp': current['timestamp'],
+        })
+
+    if archive_boundary():
+        # Pairs without hot results keep their latest row from before archiving
+        db.session.execute(db.delete(LatestResult).where(
+            db.tuple_(LatestResult.keyword_id, LatestResult.website_id).in_(
+                db.select(Result.keyword_id, Result.website_id).distinct()
+            )
+        ))
+    else:
+        db.session.execute(db.delete(LatestResult))
+    if latest:
+        db.session.execute(db.insert(LatestResult), latest)
+    db.session.commit()
+    bump_version('results')
+    return len(latest)
+
+@app.cli.command('backfill-rollups')
+def backfill_rollups_command():
+    """Rebuild the daily rank rollups and latest results from all stored results."""
+    click.echo(f'Rebuilt {backfill_daily_rollups()} daily rollup rows.')
+    click.echo(f'Rebuilt {backfill_latest_results()} latest result rows.')
+
+# Tables for archived months, kept out of db.metadata so create_all never builds them
+archive_metadata = db.MetaData()
+archive_metadata_lock = threading.Lock()
+
+def month_start(timestamp):
+    return datetime(timestamp.year, timestamp.month, 1)
+
+def next_month(start):
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+# The archive table for the month starting at start: the Result columns without
+# foreign keys (so it can live in another database) and the same indexes
+def result_archive_table(start):
+    name = f'result_archive_{start:%Y_%m}'
+    with archive_metadata_lock:
+        if name in archive_metadata.tables:
+            return archive_metadata.tables[name]
+        return db.Table(
+            name, archive_metadata,
+            *(db.Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+              for column in Result.__table__.columns),
+            db.Index(f'ix_{name}_timestamp_id', 'timestamp', 'id'),
+            db.Index(f'ix_{name}_keyword_timestamp', 'keyword_id', 'timestamp'),
+            db.Index(f'ix_{name}_website_timestamp', 'website_id', 'timestamp'),
+        )
+
+def archive_engine():
+    return db.engines.get('archive', db.engine)
+
+# End of the newest archived month; every hot Result row is at or after it
+def archive_boundary():
+    return db.session.query(db.func.max(ResultArchive.end)).scalar()
+
+# Tables holding results in [start, end], oldest first: the archived months that
+# overlap the range, then the hot Result table. Each comes with the bind_arguments
+# to execute its queries with.
+def result_sources(start=None, end=None):
+    archives = ResultArchive.query.order_by(ResultArchive.start)
+    if start is not None:
+        archives = archives.filter(ResultArchive.end > start)
+    if end is not None:
+        archives = archives.filter(ResultArchive.start <= end)
+    bind_arguments = {'bind': db.engines['archive']} if 'archive' in db.engines else None
+    sources = [(result_archive_table(archive.start), bind_arguments) for archive in archives]
+    sources.append((Result.__table__, None))
+    return sources
+
+# WHERE conditions shared by the hot and archive result tables
+def result_filters(table, keyword_id=None, website_id=None, start=None, end=None, after=None):
+    conditions = []
+    if keyword_id is not None:
+        conditions.append(table.c.keyword_id == keyword_id)
+    if website_id is not None:
+        conditions.append(table.c.website_id == website_id)
+    if start is not None:
+        conditions.append(table.c.timestamp >= start)
+    if end is not None:
+        conditions.append(table.c.timestamp <= end)
+    if after is not None:
+        after_timestamp, after_id = after
+        conditions.append(db.or_(
+            table.c.timestamp > after_timestamp,
+            db.and_(table.c.timestamp == after_timestamp, table.c.id > after_id),
+        ))
+    return conditions
+
+# Move the results of one month into its archive table, once the daily rollups
+# account for every one of them
+def archive_result_month(start):
+    end = next_month(start)
+    table = result_archive_table(start)
+    engine = archive_engine()
+    table.create(bind=engine, checkfirst=True)
+
+    def archived_count():
+        with engine.connect() as connection:
+            return connection.execute(db.select(db.func.count()).select_from(table)).scalar()
+
+    hot_count = Result.query.filter(Result.timestamp >= start, Result.timestamp < end).count()
+    expected = hot_count + archived_count()
+    rolled_up = db.session.query(db.func.coalesce(db.func.sum(ResultDaily.count), 0)).filter(
+        ResultDaily.day >= start.date(), ResultDaily.day < end.date()
+    ).scalar()
+    if rolled_up != expected:
+        raise ValueError(
+            f'Daily rollups for {start:%Y-%m} cover {rolled_up} of {expected} results; run `flask backfill-rollups` first'
+        )
+
+    # Registered before any row moves, so reads include the month from the first chunk on
+    archive = db.session.get(ResultArchive, start)
+    if archive is None:
+        archive = ResultArchive(start=start, end=end, table_name=table.name, archived_at=datetime.utcnow())
+        db.session.add(archive)
+        db.session.commit()
+
+    insert = upsert(table, engine).on_conflict_do_nothing(index_elements=['id'])
+    moved = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Result.__table__)
+            .where(Result.timestamp >= start, Result.timestamp < end)
+            .order_by(Result.id)
+            .limit(ARCHIVE_CHUNK_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        # Rows already copied by an interrupted run are skipped, so a run can be repeated
+        if 'archive' in db.engines:
+            with engine.begin() as connection:
+                connection.execute(insert, [dict(row) for row in rows])
+        else:
+            db.session.execute(insert, [dict(row) for row in rows])
+        db.session.execute(db.delete(Result).where(Result.id.in_([row['id'] for row in rows])))
+        db.session.commit()
+        moved += len(rows)
+
+    archive.row_count = archived_count()
+    archive.archived_at = datetime.utcnow()
+    db.session.commit()
+    bump_version('results')
+    return moved
+
+# Delete the results of one website or keyword (column is 'website_id' or 'keyword_id')
+# from the hot table and every archived month, with the rollups derived from them, so
+# no stored row refers to a website or keyword that is gone
+def delete_results(column, value):
+    for archive in ResultArchive.query.all():
+        table = result_archive_table(archive.start)
+        delete = db.delete(table).where(table.c[column] == value)
+        if 'archive' in db.engines:
+            with archive_engine().begin() as connection:
+                deleted = connection.execute(delete).rowcount
+        else:
+            deleted = db.session.execute(delete).rowcount
+        archive.row_count -= deleted
+    for model in (Result, ResultDaily, LatestResult):
+        db.session.execute(db.delete(model).where(getattr(model, column) == value))
+
+def delete_website_results(website_id):
+    delete_results('website_id', website_id)
+
+# A keyword's suggestion counts go with its results
+def delete_keyword_results(keyword_id):
+    delete_results('keyword_id', keyword_id)
+    db.session.execute(db.delete(KeywordSuggestion).where(KeywordSuggestion.keyword_id == keyword_id))
+
+# Archive every whole month that ended before the retention cutoff, oldest first.
+# Stops at the first month whose rollups are incomplete, so archived months always
+# precede the hot table.
+def archive_results(retention_days):
+    cutoff = month_start(datetime.utcnow() - timedelta(days=retention_days))
+    moved = {}
+    while True:
+        oldest = db.session.query(db.func.min(Result.timestamp)).filter(Result.timestamp < cutoff).scalar()
+        if oldest is None:
+            return moved
+        start = month_start(oldest)
+        moved[start] = archive_result_month(start)
+
+@app.cli.command('archive-results')
+@click.option('--days', type=int, default=None, help='Age in days (defaults to RESULT_ARCHIVE_AFTER_DAYS).')
+@click.option('--vacuum', is_flag=True, help='VACUUM the primary SQLite database afterwards to reclaim space.')
+def archive_results_command(days, vacuum):
+    """Move results older than the retention age into monthly archive tables."""
+    days = days if days is not None else app.config['RESULT_ARCHIVE_AFTER_DAYS']
+    if days is None:
+        raise click.ClickException('RESULT_ARCHIVE_AFTER_DAYS is not set')
+    try:
+        for start, moved in archive_results(days).items():
+            click.echo(f'Archived {moved} results from {start:%Y-%m}.')
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if vacuum and db.engine.dialect.name == 'sqlite':
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(db.text('VACUUM'))
+
 class ResultsResource(Resource):
     def post(self):
         data = request.json
 
-        # Validate incoming data
-        if not data or 'keyword' not in data or 'domain' not in data or 'min_rank' not in data or 'max_rank' not in data or 'avg_rank' not in data or 'suggestions' not in data:
-            return {'message': 'Keyword, domain, min_rank, max_rank, avg_rank, and suggestions are required'}, 400
+        # Validate incoming data with the same rules as a batch item
+        error = validate_result(data)
+        if error:
+            return {'message': error}, 400
 
         keyword_text = data['keyword']
         domain = data['domain']
@@ -322,6 +2253,9 @@ class ResultsResource(Resource):
         max_rank = data['max_rank']
         avg_rank = data['avg_rank']
         suggestions = data['suggestions']
+        lease_token = data.get('lease_token')
+        if lease_token is not None and not isinstance(lease_token, str):
+            return {'message': 'lease_token must be a string'}, 400
 
         # Find the keyword in the database
         keyword = Keyword.query.filter_by(keyword=keyword_text).first()
@@ -329,10 +2263,26 @@ class ResultsResource(Resource):
             return {'message': 'Keyword not found'}, 404
 
         # Find the website in the database
-        website = Website.query.filter_by(domain=domain).first()
+        website = Website.query.filter_by(domain=normalize_host(domain)).first()
         if not website:
             return {'message': 'Website not found'}, 404
 
+        if is_unranked(data):
+            # The website was not ranked: record the check and its suggestions only
+            try:
+                checked_at = datetime.utcnow()
+                checked_ids = update_keyword_schedule({(keyword.id, lease_token)}, checked_at)
+                update_result_aggregates([], checked_ids, [
+                    {'keyword_id': keyword.id, 'suggestions': suggestions, 'timestamp': checked_at},
+                ])
+                db.session.commit()
+                bump_version('results')
+                return {'message': 'Website not ranked; the check was recorded'}, 200
+            except Exception as e:
+                db.session.rollback()
+                log_action('Search Results Error', str(e))
+                return {'error': str(e)}, 500
+
         try:
             # Save results in the "Result" model
             result = Result(
@@ -341,10 +2291,22 @@ class ResultsResource(Resource):
                 min_rank=min_rank,
                 max_rank=max_rank,
                 avg_rank=avg_rank,
-                suggestions=suggestions
+                suggestions=result_suggestions_blob(suggestions)
             )
+            result.timestamp = datetime.utcnow()
             db.session.add(result)
+            checked_ids = update_keyword_schedule({(keyword.id, lease_token)}, result.timestamp)
+            update_result_aggregates([{
+                'keyword_id': keyword.id,
+                'website_id': website.id,
+                'min_rank': min_rank,
+                'max_rank': max_rank,
+                'avg_rank': avg_rank,
+                'suggestions': suggestions,
+                'timestamp': result.timestamp,
+            }], checked_ids)
             db.session.commit()
+            bump_version('results')
 
             return {'message': 'Search results processed successfully and saved to the database'}, 200
 
@@ -353,46 +2315,574 @@ class ResultsResource(Resource):
             log_action('Search Results Error', str(e))
             return {'error': str(e)}, 500
 
+    @cached_response('results', 'keywords', 'websites')
     def get(self):
-        # Optional: retrieve results based on a specific keyword or date range
+        # Optional: retrieve results based on a specific keyword, website or date range.
+        # Results are returned in (timestamp, id) order one page at a time; pass the
+        # returned next_cursor back as ?cursor= to fetch the following page.
         keyword_param = request.args.get('keyword', None)
-        start_date = request.args.get('start_date', None)
-        end_date = request.args.get('end_date', None)
+        website_param = request.args.get('website', None)
+        domain_param = request.args.get('domain', None)
+        cursor = request.args.get('cursor', None)
 
-        query = Result.query
+        try:
+            limit = parse_limit(request.args.get('limit'), RESULTS_PAGE_SIZE, RESULTS_MAX_PAGE_SIZE)
+        except ValueError:
+            return {'message': 'limit must be a positive integer'}, 400
+        try:
+            dates = parse_dates('start_date', 'end_date')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        filters = {}
 
         if keyword_param:
             keyword = Keyword.query.filter_by(keyword=keyword_param).first()
             if not keyword:
                 return {'message': 'Keyword not found'}, 404
-            query = query.filter_by(keyword_id=keyword.id)
-
-        if start_date:
-            query = query.filter(Result.timestamp >= datetime.fromisoformat(start_date))
-
-        if end_date:
-            query = query.filter(Result.timestamp <= datetime.fromisoformat(end_date))
-
-        results = query.all()
+            filters['keyword_id'] = keyword.id
+
+        if website_param or domain_param:
+            website_query = Website.query
+            if website_param:
+                website_query = website_query.filter_by(id=website_param)
+            if domain_param:
+                website_query = website_query.filter_by(domain=normalize_host(domain_param))
+            website = website_query.first()
+            if not website:
+                return {'message': 'Website not found'}, 404
+            filters['website_id'] = website.id
+
+        if dates['start_date']:
+            filters['start'] = dates['start_date']
+
+        if dates['end_date']:
+            filters['end'] = dates['end_date']
+
+        if cursor:
+            try:
+                filters['after'] = decode_cursor(cursor)
+            except ValueError:
+                return {'message': 'Invalid cursor'}, 400
+
+        # Read the archived months the range overlaps from the cursor on, then the hot
+        # table, until one row more than the page is found
+        range_start = filters.get('start')
+        if cursor and (range_start is None or filters['after'][0] > range_start):
+            range_start = filters['after'][0]
+        results = []
+        for table, bind_arguments in result_sources(range_start, filters.get('end')):
+            query = (
+                db.select(table)
+                .where(*result_filters(table, **filters))
+                .order_by(table.c.timestamp, table.c.id)
+                .limit(limit + 1 - len(results))
+            )
+            results.extend(db.session.execute(query, bind_arguments=bind_arguments).mappings())
+            if len(results) > limit:
+                break
+        has_more = len(results) > limit
+        results = results[:limit]
+
+        keywords = dict(
+            db.session.query(Keyword.id, Keyword.keyword).filter(Keyword.id.in_({result['keyword_id'] for result in results}))
+        )
+        websites = {
+            website.id: website
+            for website in Website.query.filter(Website.id.in_({result['website_id'] for result in results}))
+        }
+
+        next_cursor = encode_cursor(results[-1]['timestamp'], results[-1]['id']) if has_more else None
+        # Skip rows whose keyword or website has since been deleted
+        results = [result for result in results if result['keyword_id'] in keywords and result['website_id'] in websites]
+
+        if request.args.get('format') == 'columnar':
+            # One array per field; keyword and website index into their lookup tables
+            keyword_ids, keyword_column = dictionary_encode([result['keyword_id'] for result in results])
+            website_ids, website_column = dictionary_encode([result['website_id'] for result in results])
+            columns = {'keyword': keyword_column, 'website': website_column}
+            for name in ('min_rank', 'max_rank', 'avg_rank', 'suggestions', 'timestamp'):
+                columns[name] = [result[name] for result in results]
+            return columnar_response({
+                'rows': len(results),
+                'columns': columns,
+                'dictionaries': {
+                    'keyword': {'id': keyword_ids, 'keyword': [keywords[keyword_id] for keyword_id in keyword_ids]},
+                    'website': {
+                        'id': website_ids,
+                        'name': [websites[website_id].name for website_id in website_ids],
+                        'domain': [websites[website_id].domain for website_id in website_ids],
+                    },
+                },
+                'next_cursor': next_cursor,
+            })
 
         # Prepare data for response
         response_data = []
         for result in results:
+            website = websites[result['website_id']]
             response_data.append({
-                'keyword': result.keyword.keyword,
+                'keyword': keywords[result['keyword_id']],
                 'website': {
-                    'id': result.website.id,
-                    'name': result.website.name,
-                    'domain': result.website.domain,
+                    'id': website.id,
+                    'name': website.name,
+                    'domain': website.domain,
                 },
-                'min_rank': result.min_rank,
-                'max_rank': result.max_rank,
-                'avg_rank': result.avg_rank,
-                'suggestions': result.suggestions,
-                'timestamp': result.timestamp.isoformat()  # Return timestamp in ISO format
+                'min_rank': result['min_rank'],
+                'max_rank': result['max_rank'],
+                'avg_rank': result['avg_rank'],
+                'suggestions': result['suggestions'],
+                'timestamp': result['timestamp'].isoformat()  # Return timestamp in ISO format
+            })
+
+        return {'results': response_data, 'next_cursor': next_cursor}, 200
+
+class ResultSeriesResource(Resource):
+    @cached_response('results', 'keywords', 'websites')
+    def get(self):
+        # Rank time series read only from the daily rollups, one series per keyword/website pair
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in ('day', 'week'):
+            return {'message': 'granularity must be day or week'}, 400
+        try:
+            dates = parse_dates('start_date', 'end_date')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        query = (
+            db.session.query(ResultDaily, Keyword.keyword, Website.name, Website.domain)
+            .join(Keyword, Keyword.id == ResultDaily.keyword_id)
+            .join(Website, Website.id == ResultDaily.website_id)
+        )
+        if request.args.get('keyword'):
+            query = query.filter(Keyword.keyword == request.args['keyword'])
+        if request.args.get('domain'):
+            query = query.filter(Website.domain == normalize_host(request.args['domain']))
+        if dates['start_date']:
+            query = query.filter(ResultDaily.day >= dates['start_date'].date())
+        if dates['end_date']:
+            query = query.filter(ResultDaily.day <= dates['end_date'].date())
+
+        series = {}
+        for rollup, keyword_text, website_name, domain in query.order_by(ResultDaily.keyword_id, ResultDaily.website_id, ResultDaily.day):
+            entry = series.setdefault((rollup.keyword_id, rollup.website_id), {
+                'keyword': keyword_text,
+                'website': {'id': rollup.website_id, 'name': website_name, 'domain': domain},
+                'points': {},
+            })
+            # Weeks start on Monday
+            period = rollup.day - timedelta(days=rollup.day.weekday()) if granularity == 'week' else rollup.day
+            point = entry['points'].get(period)
+            if point is None:
+                entry['points'][period] = {
+                    'date': period.isoformat(),
+                    'count': rollup.count,
+                    'best_rank': rollup.best_rank,
+                    'worst_rank': rollup.worst_rank,
+                    'avg_rank': rollup.avg_rank,
+                }
+            else:
+                total = point['count'] + rollup.count
+                point['avg_rank'] = (point['avg_rank'] * point['count'] + rollup.avg_rank * rollup.count) / total
+                point['count'] = total
+                point['best_rank'] = min(point['best_rank'], rollup.best_rank)
+                point['worst_rank'] = max(point['worst_rank'], rollup.worst_rank)
+
+        return {'series': [dict(entry, points=list(entry['points'].values())) for entry in series.values()]}, 200
+
+# Shared query and serialisation for the LatestResult endpoints
+def latest_results_query():
+    return (
+        db.session.query(LatestResult, Keyword.keyword, Website)
+        .join(Keyword, Keyword.id == LatestResult.keyword_id)
+        .join(Website, Website.id == LatestResult.website_id)
+    )
+
+def serialize_latest_result(latest, keyword_text, website):
+    return {
+        'keyword': keyword_text,
+        'website': {'id': website.id, 'name': website.name, 'domain': website.domain},
+        'min_rank': latest.min_rank,
+        'max_rank': latest.max_rank,
+        'avg_rank': latest.avg_rank,
+        'previous_rank': latest.previous_rank,
+        'delta': latest.delta,
+        'timestamp': latest.timestamp.isoformat(),
+    }
+
+class LatestResultsResource(Resource):
+    @cached_response('results', 'keywords', 'websites')
+    def get(self):
+        # Current rank of every keyword/website pair
+        query = latest_results_query()
+        if request.args.get('keyword'):
+            query = query.filter(Keyword.keyword == request.args['keyword'])
+        if request.args.get('domain'):
+            query = query.filter(Website.domain == normalize_host(request.args['domain']))
+        rows = query.order_by(LatestResult.keyword_id, LatestResult.website_id).all()
+        return {'results': [serialize_latest_result(*row) for row in rows]}, 200
+
+class ResultMoversResource(Resource):
+    @cached_response('results', 'keywords', 'websites')
+    def get(self):
+        # Pairs whose latest rank moved by at least min_delta positions, biggest moves first
+        try:
+            min_delta = int(request.args.get('min_delta', 1))
+            limit = parse_limit(request.args.get('limit'), 100, RESULTS_MAX_PAGE_SIZE)
+        except ValueError:
+            return {'message': 'min_delta and limit must be integers'}, 400
+        min_delta = max(abs(min_delta), 1)
+
+        rows = (
+            latest_results_query()
+            .filter(db.or_(LatestResult.delta >= min_delta, LatestResult.delta <= -min_delta))
+            .order_by(db.func.abs(LatestResult.delta).desc(), LatestResult.timestamp.desc())
+            .limit(limit)
+            .all()
+        )
+        return {'results': [serialize_latest_result(*row) for row in rows]}, 200
+
+# Write-only file object whose contents are drained after every Parquet row group
+class ParquetChunkSink:
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+class ResultsExportResource(Resource):
+    def get(self):
+        # Stream results as CSV, XLSX or Parquet, reading the database in fixed-size chunks
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'xlsx', 'parquet'):
+            return {'message': 'format must be csv, xlsx or parquet'}, 400
+        if export_format == 'parquet' and pyarrow is None:
+            return {'message': 'Parquet export requires pyarrow to be installed'}, 501
+        try:
+            dates = parse_dates('start_date', 'end_date')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        filters = {}
+        if request.args.get('keyword'):
+            filters['keyword_id'] = db.session.query(Keyword.id).filter_by(keyword=request.args['keyword']).scalar()
+            if filters['keyword_id'] is None:
+                return {'message': 'Keyword not found'}, 404
+        if request.args.get('domain'):
+            filters['website_id'] = db.session.query(Website.id).filter_by(domain=normalize_host(request.args['domain'])).scalar()
+            if filters['website_id'] is None:
+                return {'message': 'Website not found'}, 404
+        if dates['start_date']:
+            filters['start'] = dates['start_date']
+        if dates['end_date']:
+            filters['end'] = dates['end_date']
+        sources = result_sources(filters.get('start'), filters.get('end'))
+        if export_format == 'xlsx' and count_results(sources, filters, EXPORT_XLSX_MAX_ROWS) > EXPORT_XLSX_MAX_ROWS:
+            return {
+                'message': f'XLSX exports are limited to {EXPORT_XLSX_MAX_ROWS} rows; '
+                           'narrow the filters or use format=csv or format=parquet'
+            }, 400
+
+        # The suggestions column is left out when result rows no longer keep their lists
+        keep_suggestions = app.config['KEEP_RESULT_SUGGESTIONS']
+        columns = EXPORT_COLUMNS if keep_suggestions else EXPORT_COLUMNS[:-1]
+
+        # Archive tables may live in another database, so keyword and website names are
+        # looked up per chunk (and remembered) instead of joined
+        keywords = {}
+        websites = {}
+
+        def chunks():
+            for table, bind_arguments in sources:
+                query = (
+                    db.select(
+                        table.c.timestamp, table.c.keyword_id, table.c.website_id,
+                        table.c.min_rank, table.c.max_rank, table.c.avg_rank, table.c.suggestions,
+                    )
+                    .where(*result_filters(table, **filters))
+                    .order_by(table.c.timestamp, table.c.id)
+                    .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+                )
+                for chunk in db.session.execute(query, bind_arguments=bind_arguments).partitions():
+                    missing = {row.keyword_id for row in chunk} - keywords.keys()
+                    if missing:
+                        keywords.update(db.session.query(Keyword.id, Keyword.keyword).filter(Keyword.id.in_(missing)))
+                    missing = {row.website_id for row in chunk} - websites.keys()
+                    if missing:
+                        websites.update(
+                            (website_id, (domain, name))
+                            for website_id, domain, name in db.session.query(Website.id, Website.domain, Website.name)
+                            .filter(Website.id.in_(missing))
+                        )
+                    rows = [
+                        (row.timestamp, keywords[row.keyword_id], *websites[row.website_id],
+                         row.min_rank, row.max_rank, row.avg_rank)
+                        for row in chunk
+                    ]
+                    if keep_suggestions:
+                        # Rows stored while the lists were not kept get an empty cell
+                        rows = [
+                            (*values, json.dumps(row.suggestions) if row.suggestions is not None else None)
+                            for values, row in zip(rows, chunk)
+                        ]
+                    yield rows
+
+        generate, mimetype = {
+            'csv': (export_csv, 'text/csv'),
+            'xlsx': (export_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+            'parquet': (export_parquet, 'application/vnd.apache.parquet'),
+        }[export_format]
+        return Response(
+            stream_with_context(generate(chunks(), columns)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=results.{export_format}'},
+        )
+
+# Number of results matching the filters across the given sources, counting no further than limit + 1
+def count_results(sources, filters, limit):
+    total = 0
+    for table, bind_arguments in sources:
+        matching = db.select(table.c.id).where(*result_filters(table, **filters)).limit(limit + 1 - total).subquery()
+        total += db.session.execute(db.select(db.func.count()).select_from(matching), bind_arguments=bind_arguments).scalar()
+        if total > limit:
+            break
+    return total
+
+def export_csv(chunks, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((timestamp.isoformat(), *rest) for timestamp, *rest in chunk)
+        yield buffer.getvalue()
+
+def export_xlsx(chunks, columns):
+    # Write-only rows are spooled to disk by openpyxl; the zip container can
+    # only be emitted once complete, so it is streamed from a temporary file
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('results')
+    sheet.append(columns)
+    for chunk in chunks:
+        for row in chunk:
+            sheet.append(row)
+    with tempfile.TemporaryFile() as spooled:
+        workbook.save(spooled)
+        spooled.seek(0)
+        while data := spooled.read(64 * 1024):
+            yield data
+
+def export_parquet(chunks, columns):
+    types = {
+        'timestamp': pyarrow.timestamp('us'),
+        'keyword': pyarrow.string(),
+        'domain': pyarrow.string(),
+        'website_name': pyarrow.string(),
+        'min_rank': pyarrow.int64(),
+        'max_rank': pyarrow.int64(),
+        'avg_rank': pyarrow.float64(),
+        'suggestions': pyarrow.string(),
+    }
+    schema = pyarrow.schema([(column, types[column]) for column in columns])
+    sink = ParquetChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode='w'), schema)
+    for chunk in chunks:
+        # One row group per chunk, drained to the client as soon as it is written
+        writer.write_table(pyarrow.Table.from_arrays([pyarrow.array(column) for column in zip(*chunk)], schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+class ResultsBatchResource(Resource):
+    def post(self):
+        data = request.json
+        items = data.get('results') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return {'message': 'A non-empty list of results is required'}, 400
+        if len(items) > RESULTS_BATCH_MAX_SIZE:
+            return {'message': f'At most {RESULTS_BATCH_MAX_SIZE} results can be sent in one batch'}, 400
+
+        # Resolve every keyword and domain in the batch with one IN query each
+        keyword_texts = {item['keyword'] for item in items if isinstance(item, dict) and isinstance(item.get('keyword'), str)}
+        domains = {item['domain'] for item in items if isinstance(item, dict) and isinstance(item.get('domain'), str)}
+        keyword_ids = dict(db.session.query(Keyword.keyword, Keyword.id).filter(Keyword.keyword.in_(keyword_texts)))
+        website_ids = website_ids_by_domain(domains)
+
+        # Every accepted item reports a check of its keyword under the lease token it
+        # carries; rejected items do not (see update_keyword_schedule). Items with null
+        # ranks are accepted as not_ranked: they record the check and suggestions only.
+        checks = set()
+        statuses = []
+        rows = []
+        unranked = []
+        now = datetime.utcnow()
+        for index, item in enumerate(items):
+            error = validate_result(item)
+            if not error and item.get('lease_token') is not None and not isinstance(item['lease_token'], str):
+                error = 'lease_token must be a string'
+            if not error and item['keyword'] not in keyword_ids:
+                error = 'Keyword not found'
+            if not error and item['domain'] not in website_ids:
+                error = 'Website not found'
+            if error:
+                statuses.append({'index': index, 'status': 'error', 'message': error})
+                continue
+
+            checks.add((keyword_ids[item['keyword']], item.get('lease_token')))
+            if is_unranked(item):
+                unranked.append({'keyword_id': keyword_ids[item['keyword']], 'suggestions': item['suggestions'], 'timestamp': now})
+                statuses.append({'index': index, 'status': 'not_ranked'})
+                continue
+            rows.append({
+                'keyword_id': keyword_ids[item['keyword']],
+                'website_id': website_ids[item['domain']],
+                'min_rank': item['min_rank'],
+                'max_rank': item['max_rank'],
+                'avg_rank': item['avg_rank'],
+                'suggestions': item['suggestions'],
+                'timestamp': now,
             })
+            statuses.append({'index': index, 'status': 'created'})
 
-        return {'results': response_data}, 200
+        try:
+            if rows:
+                db.session.execute(db.insert(Result), [
+                    dict(row, suggestions=result_suggestions_blob(row['suggestions'])) for row in rows
+                ])
+            if checks:
+                update_result_aggregates(rows, update_keyword_schedule(checks, now), unranked)
+            db.session.commit()
+            bump_version('results')
+        except Exception as e:
+            db.session.rollback()
+            log_action('Search Results Error', str(e))
+            return {'error': str(e)}, 500
+
+        return {
+            'message': f'{len(rows)} of {len(items)} results saved, {len(unranked)} not ranked',
+            'created': len(rows),
+            'not_ranked': len(unranked),
+            'failed': len(items) - len(rows) - len(unranked),
+            'items': statuses,
+        }, 200
+
+class SuggestionsResource(Resource):
+    @cached_response('results', 'keywords')
+    def get(self):
+        # Interned suggestions, most recently seen first. q is a case-insensitive
+        # prefix; since keeps suggestions first seen at or after that time.
+        try:
+            limit = parse_limit(request.args.get('limit'), 100, SUGGESTIONS_MAX_PAGE_SIZE)
+        except ValueError:
+            return {'message': 'limit must be a positive integer'}, 400
+        try:
+            dates = parse_dates('since')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+
+        query = (
+            db.session.query(KeywordSuggestion, Suggestion.text, Keyword.keyword)
+            .join(Suggestion, Suggestion.id == KeywordSuggestion.suggestion_id)
+            .join(Keyword, Keyword.id == KeywordSuggestion.keyword_id)
+        )
+        if request.args.get('keyword'):
+            query = query.filter(Keyword.keyword == request.args['keyword'])
+        if request.args.get('q'):
+            prefix = request.args['q'].lower()
+            query = query.filter(Suggestion.search_text >= prefix, Suggestion.search_text < prefix + '\U0010ffff')
+        if dates['since']:
+            query = query.filter(KeywordSuggestion.first_seen >= dates['since'])
+
+        rows = query.order_by(KeywordSuggestion.last_seen.desc()).limit(limit).all()
+        return {
+            'suggestions': [
+                {
+                    'keyword': keyword_text,
+                    'suggestion': text,
+                    'first_seen': link.first_seen.isoformat(),
+                    'last_seen': link.last_seen.isoformat(),
+                    'count': link.count,
+                }
+                for link, text, keyword_text in rows
+            ]
+        }, 200
+
+class BotStatusResource(Resource):
+    def get(self):
+        heartbeat = db.session.get(BotHeartbeat, 1)
+        if not heartbeat:
+            return {'last_seen': None, 'last_action': None, 'seconds_since': None}, 200
+        return {
+            'last_seen': heartbeat.last_seen.isoformat(),
+            'last_action': heartbeat.last_action,
+            'seconds_since': (datetime.utcnow() - heartbeat.last_seen).total_seconds(),
+        }, 200
+
+def serialize_bot_run(run):
+    return dict(run.summary, id=run.id)
+
+class BotRunsResource(Resource):
+    @cached_response('bot_runs')
+    def get(self):
+        # Most recent run summaries first
+        try:
+            limit = parse_limit(request.args.get('limit'), BOT_RUNS_PAGE_SIZE, BOT_RUNS_MAX_PAGE_SIZE)
+        except ValueError:
+            return {'message': 'limit must be a positive integer'}, 400
+        runs = BotRun.query.order_by(BotRun.started_at.desc(), BotRun.id.desc()).limit(limit).all()
+        return {'runs': [serialize_bot_run(run) for run in runs]}, 200
+
+    def post(self):
+        # Store a run summary; posting the same run_id again replaces it
+        data = request.json
+        if not isinstance(data, dict) or any(field not in data for field in BOT_RUN_FIELDS):
+            return {'message': f'{", ".join(BOT_RUN_FIELDS)} are required'}, 400
+        try:
+            started_at = datetime.fromisoformat(data['started_at'])
+            finished_at = datetime.fromisoformat(data['finished_at'])
+            values = {
+                'run_id': str(data['run_id'])[:32],
+                'started_at': started_at,
+                'finished_at': finished_at,
+                'duration_seconds': float(data['duration_seconds']),
+                'keywords': int(data['keywords']),
+                'results': int(data['results']),
+                'keywords_per_minute': float(data['keywords_per_minute']) if data.get('keywords_per_minute') is not None else None,
+                'sleep_seconds': float(data['sleep_seconds']),
+                'summary': data,
+            }
+        except (TypeError, ValueError):
+            return {'message': 'Timestamps must be ISO 8601 and durations and counts numbers'}, 400
+
+        stmt = upsert(BotRun)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['run_id'],
+            set_={column: getattr(stmt.excluded, column) for column in values if column != 'run_id'},
+        )
+        try:
+            db.session.execute(stmt, values)
+            db.session.commit()
+            bump_version('bot_runs')
+        except Exception as e:
+            db.session.rollback()
+            log_action('Bot Run Error', str(e))
+            return {'error': str(e)}, 500
+        log_action('Bot Run', f"Run {values['run_id']}: {values['keywords']} keywords in {values['duration_seconds']:.0f}s")
+        return {'message': 'Run saved', 'run_id': values['run_id']}, 200
 
 class botResource(Resource):
     def get(self):
@@ -403,12 +2893,24 @@ class botResource(Resource):
 
 # Add the ResultsResource to the API
 api.add_resource(ResultsResource, '/results')
+api.add_resource(ResultsBatchResource, '/results/batch')
+api.add_resource(ResultSeriesResource, '/results/series')
+api.add_resource(LatestResultsResource, '/results/latest')
+api.add_resource(ResultMoversResource, '/results/movers')
+api.add_resource(ResultsExportResource, '/results/export')
 
 api.add_resource(WebsiteResource, '/websites')
 api.add_resource(KeywordResource, '/keywords')
-#api.add_resource(ExcelUploadResource, '/upload_excel')
+api.add_resource(KeywordDueResource, '/keywords/due')
+api.add_resource(WebsiteBulkResource, '/websites/bulk')
+api.add_resource(KeywordBulkResource, '/keywords/bulk')
+api.add_resource(ExcelUploadResource, '/upload_excel')
+api.add_resource(ImportJobResource, '/imports/<int:job_id>')
 api.add_resource(botResource, '/bot')
+api.add_resource(BotStatusResource, '/bot/status')
+api.add_resource(BotRunsResource, '/bot/runs')
 api.add_resource(LogsResource, '/logs')
+api.add_resource(SuggestionsResource, '/suggestions')
 
 @app.route('/')
 def home():
@@ -416,4 +2918,5 @@ def home():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        upgrade_schema()
     app.run(debug=True)
@@ -0,0 +1 @@
+"""Benchmarks for the API and the search bot. Run each module with ``python -m benchmarks.<name>``."""
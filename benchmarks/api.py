@@ -0,0 +1,303 @@
+"""Latency, SQL queries and memory of every API endpoint on generated data.
+
+Generates a database with benchmarks.generator (or reuses one), then sends each
+endpoint a series of seeded requests through Flask's test client and reports
+p50/p95/p99 latency, SQL statements per request, response size and memory. Each
+endpoint runs in its own interpreter, and each request gets its own app context and
+session as on a server, so the peak RSS reported for an endpoint (and its growth
+over the process's RSS before the first request) belongs to that endpoint alone.
+The run is saved as JSON so runs on different commits can be compared with
+--baseline.
+
+    python -m benchmarks.api --scale small [--database bench.db] [--requests 50]
+                             [--output run.json] [--baseline previous.json]
+
+The response cache is disabled unless --cache is given, so every request reaches
+the database. POST endpoints add rows to a reused database.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import percentiles, use_temporary_database
+from benchmarks.generator import SCALES, keyword_text, suggestion_pool
+
+
+def result_payload(rng, context):
+    keyword_id = rng.randint(1, context['keywords'])
+    min_rank = rng.randint(1, 100)
+    return {
+        'keyword': keyword_text(keyword_id),
+        'domain': f'site{rng.randint(1, context["websites"])}.example',
+        'min_rank': min_rank,
+        'max_rank': min_rank + 5,
+        'avg_rank': min_rank + 2.5,
+        'suggestions': suggestion_pool(keyword_text(keyword_id))[:5],
+    }
+
+
+def random_keyword(rng, context):
+    return keyword_text(rng.randint(1, context['keywords'])).replace(' ', '%20')
+
+
+def random_domain(rng, context):
+    return f'site{rng.randint(1, context["websites"])}.example'
+
+
+def random_day(rng, context):
+    day = context['first_day'] + timedelta(days=rng.randrange(max(1, (context['last_day'] - context['first_day']).days)))
+    return f'start_date={day.isoformat()}&end_date={(day + timedelta(days=1)).isoformat()}'
+
+
+# name -> (method, request factory returning (path, json body), share of --requests).
+# Endpoints returning whole tables get a smaller share.
+ENDPOINTS = {
+    'GET /websites': ('GET', lambda rng, ctx: ('/websites', None), 1),
+    'GET /websites?q': ('GET', lambda rng, ctx: (f'/websites?q=site{rng.randint(1, ctx["websites"])}', None), 1),
+    'GET /keywords': ('GET', lambda rng, ctx: ('/keywords', None), 0.1),
+    'GET /keywords?page': (
+        'GET', lambda rng, ctx: (f'/keywords?page={rng.randint(1, max(1, ctx["keywords"] // 100))}&limit=100', None), 1,
+    ),
+    'GET /keywords?q': ('GET', lambda rng, ctx: (f'/keywords?q=product%20{rng.randint(1, ctx["keywords"])}', None), 1),
+    'GET /results?keyword': ('GET', lambda rng, ctx: (f'/results?keyword={random_keyword(rng, ctx)}&limit=500', None), 1),
+    'GET /results?domain': ('GET', lambda rng, ctx: (f'/results?domain={random_domain(rng, ctx)}&limit=500', None), 1),
+    'GET /results?date': ('GET', lambda rng, ctx: (f'/results?{random_day(rng, ctx)}&limit=500', None), 1),
+    'GET /results/series': ('GET', lambda rng, ctx: (f'/results/series?keyword={random_keyword(rng, ctx)}', None), 1),
+    'GET /results/latest': ('GET', lambda rng, ctx: ('/results/latest', None), 0.1),
+    'GET /results/movers': ('GET', lambda rng, ctx: ('/results/movers?limit=100', None), 1),
+    'GET /results/export': (
+        'GET', lambda rng, ctx: (f'/results/export?format=csv&keyword={random_keyword(rng, ctx)}', None), 1,
+    ),
+    'GET /suggestions': ('GET', lambda rng, ctx: (f'/suggestions?keyword={random_keyword(rng, ctx)}', None), 1),
+    'GET /logs': ('GET', lambda rng, ctx: ('/logs?limit=100', None), 1),
+    'GET /logs?action': ('GET', lambda rng, ctx: ('/logs?limit=100&action=Add%20Keyword', None), 1),
+    'GET /bot/status': ('GET', lambda rng, ctx: ('/bot/status', None), 1),
+    'POST /results': ('POST', lambda rng, ctx: ('/results', result_payload(rng, ctx)), 1),
+    'POST /results/batch': (
+        'POST', lambda rng, ctx: ('/results/batch', [result_payload(rng, ctx) for _ in range(100)]), 1,
+    ),
+}
+
+
+def peak_rss_mb():
+    # VmHWM on Linux: unlike ru_maxrss it is not carried over from the parent across exec
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def database_context():
+    """Sizes and date range the request factories draw from."""
+    from app import Keyword, Log, Result, Website, db
+
+    first, last = db.session.query(db.func.min(Result.timestamp), db.func.max(Result.timestamp)).one()
+    return {
+        'websites': db.session.query(db.func.count(Website.id)).scalar(),
+        'keywords': db.session.query(db.func.count(Keyword.id)).scalar(),
+        'results': db.session.query(db.func.count(Result.id)).scalar(),
+        'logs': db.session.query(db.func.count(Log.id)).scalar(),
+        'first_day': (first or datetime.utcnow()).date(),
+        'last_day': (last or datetime.utcnow()).date(),
+    }
+
+
+def run_endpoints(api_module, context, requests, seed, names=None):
+    from app import db
+
+    # Count statements issued by the request thread only, not the background log writer
+    request_thread = threading.get_ident()
+    statements = [0]
+
+    def count_statement(*args):
+        if threading.get_ident() == request_thread:
+            statements[0] += 1
+
+    # Requests are sent outside any app context, so each gets its own (and its own session)
+    with api_module.app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        db.event.listen(engine, 'before_cursor_execute', count_statement)
+
+    client = api_module.app.test_client()
+    report = {}
+    for name, (method, make_request, share) in ENDPOINTS.items():
+        if names and name not in names:
+            continue
+        # One unmeasured request first, so the fresh process's first-request setup is not timed
+        path, body = make_request(random.Random(f'{seed}-{name}-warmup'), context)
+        client.open(path, method=method, json=body).close()
+        rng = random.Random(f'{seed}-{name}')
+        rss_before = peak_rss_mb()
+        latencies, queries, sizes, status_codes = [], [], [], {}
+        for _ in range(max(3, round(requests * share))):
+            path, body = make_request(rng, context)
+            statements[0] = 0
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            size = len(response.get_data())
+            latencies.append(time.perf_counter() - started)
+            response.close()
+            queries.append(statements[0])
+            sizes.append(size)
+            status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+        report[name] = {
+            'requests': len(latencies),
+            **{f'{key}_ms': round(value * 1000, 3) for key, value in percentiles(latencies).items()},
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+            'mean_bytes': round(sum(sizes) / len(sizes)),
+            'status_codes': status_codes,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+        }
+
+    for engine in engines:
+        db.event.remove(engine, 'before_cursor_execute', count_statement)
+    return report
+
+
+def print_endpoint(name, entry):
+    print(
+        f"{name:<24} p50 {entry['p50_ms']:9.2f} ms  p95 {entry['p95_ms']:9.2f} ms  "
+        f"p99 {entry['p99_ms']:9.2f} ms  queries {entry['queries_per_request']:6.1f}  "
+        f"bytes {entry['mean_bytes']:>10}  rss +{entry['rss_growth_mb']:6.1f} MB  {entry['status_codes']}"
+    )
+
+
+def run_child(args):
+    """Run the --endpoint given on the database prepared by the parent; prints the report as JSON."""
+    import app as api_module
+
+    if not args.cache:
+        api_module.response_cache.max_entries = 0
+    context = json.loads(args.child)
+    context['first_day'] = date.fromisoformat(context['first_day'])
+    context['last_day'] = date.fromisoformat(context['last_day'])
+    report = run_endpoints(api_module, context, args.requests, args.seed, args.endpoint)
+    api_module.log_writer.close()
+    print(json.dumps(report))
+
+
+def run_in_subprocess(name, context, args):
+    command = [
+        sys.executable, '-m', 'benchmarks.api', '--endpoint', name, '--requests', str(args.requests),
+        '--seed', str(args.seed), '--child', json.dumps(context, default=date.isoformat),
+    ]
+    if args.cache:
+        command.append('--cache')
+    # DATABASE_URL is inherited from this process
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])[name]
+
+
+def compare(baseline, current):
+    print(f"\nagainst {baseline['meta'].get('commit')} ({baseline['meta'].get('scale')}):")
+    for name, now in current['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before:
+            print(f'{name:<24} (new)')
+            continue
+        ratios = '  '.join(
+            f"{key[:-3]} x{now[key] / before[key]:5.2f}" if before[key] else f"{key[:-3]}    -"
+            for key in ('p50_ms', 'p95_ms', 'p99_ms')
+        )
+        print(f"{name:<24} {ratios}  queries {before['queries_per_request']:6.1f} -> {now['queries_per_request']:6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database', help='SQLite file to reuse, or to generate into and keep if missing')
+    parser.add_argument('--requests', type=int, default=50, help='requests per endpoint')
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='only run these endpoints')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--output', help='JSON report path (default benchmark-api-<scale>-<commit>.json)')
+    parser.add_argument('--baseline', help='JSON report of an earlier run to compare against')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    temporary = None
+    generate = True
+    if args.database:
+        generate = not os.path.exists(args.database)
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    else:
+        temporary = use_temporary_database('bench-api')
+
+    import app as api_module
+    from benchmarks.generator import generate as generate_data
+
+    with api_module.app.app_context():
+        generated = generate_data(args.scale, args.seed, progress=lambda message: None) if generate else None
+        context = database_context()
+    api_module.log_writer.close()
+    print(
+        f"{context['websites']} websites, {context['keywords']} keywords, {context['results']} results, "
+        f"{context['logs']} logs" + (f" (generated in {generated['seconds']} s)" if generated else '')
+    )
+    endpoints = {}
+    for name in ENDPOINTS:
+        if args.endpoint and name not in args.endpoint:
+            continue
+        endpoints[name] = run_in_subprocess(name, context, args)
+        print_endpoint(name, endpoints[name])
+    if temporary:
+        os.remove(temporary)
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'date': datetime.utcnow().isoformat(timespec='seconds'),
+            'scale': args.scale if generate else None,
+            'seed': args.seed,
+            'requests': args.requests,
+            'cache': args.cache,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'rows': {key: context[key] for key in ('websites', 'keywords', 'results', 'logs')},
+            'generate_seconds': generated['seconds'] if generated else None,
+            'generate_peak_rss_mb': round(peak_rss_mb(), 1),
+        },
+        'endpoints': endpoints,
+    }
+    output = args.output or f'benchmark-api-{args.scale}-{commit or "unknown"}.json'
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f'\nSaved {output}')
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(json.load(handle), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Cost of uploading bot results: bare requests calls vs. the pooled ApiClient.
+
+The bot used to call requests.post for every upload, opening a new TCP connection
+each time. It now spools every keyword's results to disk (one fsync per keyword)
+and uploads them through ApiClient, whose session keeps connections alive. This
+serves the API over real HTTP on a fresh SQLite file, uploads --batches batches of
+--batch-size results both ways, and also times the spool on its own.
+
+    python -m benchmarks.bot_upload [--batches 200] [--batch-size 50] [--domains 5]
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmarks.common import percentiles, use_temporary_database
+
+
+def make_batch(rng, keywords, domains, size):
+    return [
+        {
+            'keyword': rng.choice(keywords),
+            'domain': rng.choice(domains),
+            'min_rank': rank,
+            'max_rank': rank + 3,
+            'avg_rank': rank + 1.5,
+            'suggestions': [f'suggestion {rng.randrange(50)}' for _ in range(5)],
+        }
+        for rank in (rng.randint(1, 50) for _ in range(size))
+    ]
+
+
+def time_uploads(post, batches):
+    samples = []
+    for batch in batches:
+        started = time.perf_counter()
+        post('/bot', {'results': len(batch)})
+        response = post('/results/batch', {'results': batch})
+        samples.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise SystemExit(f'Upload failed: {response.status_code} {response.text}')
+    return samples
+
+
+def report(name, samples, batch_size):
+    p = percentiles(samples)
+    total = sum(samples)
+    print(
+        f'{name:<24}{p["p50"] * 1000:>10.2f}{p["p95"] * 1000:>10.2f}'
+        f'{total / (len(samples) * batch_size) * 1e6:>14.1f}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batches', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--domains', type=int, default=5, help='results per keyword, i.e. per spool append')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    use_temporary_database('bench-bot-upload')
+    import app as api_module
+    from api_client import ApiClient, ResultSpool
+
+    with api_module.app.app_context():
+        api_module.db.create_all()
+        api_module.upgrade_schema()
+    client = api_module.app.test_client()
+    domains = [f'site{i}.example' for i in range(20)]
+    keywords = [f'keyword {i}' for i in range(200)]
+    client.post('/websites/bulk', json={'websites': [{'name': domain, 'domain': domain} for domain in domains]})
+    client.post('/keywords/bulk', json={'keywords': [{'keyword': keyword, 'domains': domains} for keyword in keywords]})
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, api_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    rng = random.Random(args.seed)
+    batches = [make_batch(rng, keywords, domains, args.batch_size) for _ in range(args.batches)]
+    api = ApiClient(base_url)
+    try:
+        print(f'{args.batches} uploads of {args.batch_size} results')
+        print(f'{"":<24}{"p50 ms":>10}{"p95 ms":>10}{"us/result":>14}')
+        report('requests.post', time_uploads(lambda path, body: requests.post(f'{base_url}{path}', json=body), batches), args.batch_size)
+        report('ApiClient (pooled)', time_uploads(lambda path, body: api.post(path, json=body), batches), args.batch_size)
+
+        with tempfile.TemporaryDirectory() as directory:
+            spool = ResultSpool(os.path.join(directory, 'spool.db'))
+            items = [item for batch in batches for item in batch]
+            appends = []
+            for start in range(0, len(items), args.domains):
+                started = time.perf_counter()
+                spool.append(items[start:start + args.domains])
+                appends.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            while True:
+                entries = spool.peek(args.batch_size)
+                if not entries:
+                    break
+                spool.remove(entries[-1][0])
+            drain = time.perf_counter() - started
+            spool.close()
+        p = percentiles(appends)
+        print(
+            f'\nspool append ({args.domains} results): p50 {p["p50"] * 1000:.2f} ms, p95 {p["p95"] * 1000:.2f} ms, '
+            f'{sum(appends) / len(items) * 1e6:.1f} us/result; '
+            f'read and remove: {drain / len(items) * 1e6:.1f} us/result'
+        )
+    finally:
+        api.close()
+        server.shutdown()
+        api_module.log_writer.close()
+
+
+if __name__ == '__main__':
+    main()
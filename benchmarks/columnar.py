@@ -0,0 +1,133 @@
+"""Bytes and milliseconds per 100k rows of the bulk GET endpoints, default vs. ?format=columnar.
+
+Reads --rows rows of /results and /logs (following next_cursor at the largest page
+size) and every keyword from /keywords through the Flask test client, once per
+variant: the default format, ?format=columnar, and columnar with gzip and (when the
+brotli package is installed) brotli content coding. The response cache is disabled.
+For each, the report gives response bytes, server time (request to complete body) and
+client decode time (decompress + json.loads, as a dashboard would) per 100k rows.
+
+    python -m benchmarks.columnar [--database bench-small.db | --scale small] [--rows 100000]
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+
+from benchmarks.common import use_temporary_database
+from benchmarks.generator import SCALES
+
+# (path, page size); /keywords is read in one request
+ENDPOINTS = {
+    'results': ('/results', 5000),
+    'logs': ('/logs', 1000),
+    'keywords': ('/keywords', None),
+}
+
+
+def variants(api_module):
+    found = [('default', {}, {}), ('columnar', {'format': 'columnar'}, {})]
+    found.append(('columnar+gzip', {'format': 'columnar'}, {'Accept-Encoding': 'gzip'}))
+    if api_module.brotli is not None:
+        found.append(('columnar+br', {'format': 'columnar'}, {'Accept-Encoding': 'br'}))
+    return found
+
+
+def decode(response, brotli):
+    body = response.get_data()
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    elif encoding == 'br':
+        body = brotli.decompress(body)
+    return json.loads(body)
+
+
+def row_count(payload, name):
+    if 'rows' in payload:
+        return payload['rows']
+    return len(payload) if isinstance(payload, list) else len(payload[name])
+
+
+def read_endpoint(client, brotli, name, params, headers, rows):
+    """Page through up to rows rows; returns (rows, bytes, server seconds, decode seconds)."""
+    path, page_size = ENDPOINTS[name]
+    params = dict(params, **({'limit': page_size} if page_size else {}))
+    total_rows = total_bytes = server = decoding = 0
+    while True:
+        started = time.perf_counter()
+        response = client.get(path, query_string=params, headers=headers)
+        body = response.get_data()
+        server += time.perf_counter() - started
+        if response.status_code != 200:
+            raise SystemExit(f'{path} failed: {response.status_code} {body[:200]}')
+        started = time.perf_counter()
+        payload = decode(response, brotli)
+        decoding += time.perf_counter() - started
+        total_rows += row_count(payload, name)
+        total_bytes += len(body)
+        cursor = payload.get('next_cursor') if isinstance(payload, dict) else None
+        if not page_size or not cursor or total_rows >= rows:
+            return total_rows, total_bytes, server, decoding
+        params['cursor'] = cursor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database', help='SQLite file to reuse, or to generate into and keep if missing')
+    parser.add_argument('--rows', type=int, default=100_000, help='rows to read from /results and /logs')
+    parser.add_argument('--repeat', type=int, default=3, help='passes per variant; the fastest is reported')
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args()
+
+    temporary = None
+    generate = True
+    if args.database:
+        generate = not os.path.exists(args.database)
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    else:
+        temporary = use_temporary_database('bench-columnar')
+
+    import app as api_module
+    from benchmarks.generator import generate as generate_data
+
+    api_module.response_cache.max_entries = 0
+    with api_module.app.app_context():
+        if generate:
+            generate_data(args.scale, args.seed, progress=lambda message: None)
+    client = api_module.app.test_client()
+
+    report = {}
+    print(f'{"endpoint":<10}{"format":<15}{"rows":>8}{"MB/100k":>10}{"server ms/100k":>16}{"decode ms/100k":>16}')
+    for name in ENDPOINTS:
+        report[name] = {}
+        for variant, params, headers in variants(api_module):
+            passes = [read_endpoint(client, api_module.brotli, name, params, headers, args.rows) for _ in range(args.repeat)]
+            rows, size, server, decoding = min(passes, key=lambda run: run[2] + run[3])
+            scale = 100_000 / rows if rows else 0
+            report[name][variant] = {
+                'rows': rows,
+                'bytes_per_100k': round(size * scale),
+                'server_ms_per_100k': round(server * scale * 1000, 1),
+                'decode_ms_per_100k': round(decoding * scale * 1000, 1),
+            }
+            print(
+                f'{name:<10}{variant:<15}{rows:>8}{size * scale / 1e6:>10.2f}'
+                f'{server * scale * 1000:>16.1f}{decoding * scale * 1000:>16.1f}'
+            )
+    print(f'\nserializer: {"orjson" if api_module.orjson is not None else "json"}, '
+          f'brotli: {"installed" if api_module.brotli is not None else "not installed"}')
+
+    api_module.log_writer.close()
+    if temporary:
+        os.remove(temporary)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
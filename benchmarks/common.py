@@ -0,0 +1,22 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import tempfile
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Return {'p50': ..., ...} for the given samples (nearest-rank), in the samples' unit."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f'p{point}': None for point in points}
+    return {
+        f'p{point}': ordered[min(len(ordered) - 1, max(0, round(point / 100 * len(ordered)) - 1))]
+        for point in points
+    }
+
+
+def use_temporary_database(prefix='bench'):
+    """Point app.py at a fresh SQLite file. Must run before ``import app``."""
+    handle, path = tempfile.mkstemp(prefix=f'{prefix}-', suffix='.db')
+    os.close(handle)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    return path
@@ -0,0 +1,200 @@
+"""Read latency on GET handlers while results are being ingested.
+
+Runs the API in-process against a fresh SQLite file in two storage modes, each in
+its own interpreter because the storage configuration is read when app.py is
+imported:
+
+- ``rollback``: no connection pragmas (SQLITE_PRAGMAS=off, so SQLite's rollback journal
+  and defaults) and no read engine (the original setup)
+- ``wal``: the default WAL journal, tuned pragmas and a separate read engine
+
+Writer processes POST /results/batch continuously while reader threads GET
+/results, /results/series and /logs; the report compares read latency percentiles,
+throughput and failed requests between the modes, counting requests that failed
+with "database is locked" apart from other failures. Writers run in separate
+processes so that their Python work does not compete with the readers for the GIL
+and only database locking shows up in the read latencies.
+
+    python -m benchmarks.concurrency [--seconds 10] [--readers 4] [--writers 2]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import percentiles, use_temporary_database
+
+MODES = {
+    'rollback': {'SQLITE_PRAGMAS': 'off', 'DATABASE_READ_URL': ''},
+    'wal': {},
+}
+
+
+def outcome(request):
+    """Make one request: None when it succeeded, 'locked' when SQLite reported the database locked, else 'failed'."""
+    try:
+        response = request()
+    except Exception as e:
+        return 'locked' if 'database is locked' in str(e) else 'failed'
+    if response.status_code == 200:
+        return None
+    return 'locked' if b'database is locked' in response.get_data() else 'failed'
+
+
+def seed(client, websites=20, keywords=200):
+    client.post('/websites/bulk', json={'websites': [
+        {'name': f'site {i}', 'domain': f'site{i}.example'} for i in range(websites)
+    ]})
+    client.post('/keywords/bulk', json={'keywords': [
+        {'keyword': f'keyword {i}', 'domains': [f'site{(i + j) % websites}.example' for j in range(3)]}
+        for i in range(keywords)
+    ]})
+    return [f'keyword {i}' for i in range(keywords)], [f'site{i}.example' for i in range(websites)]
+
+
+def writer(keywords, domains, batch_size, stop, report):
+    # Runs in its own process, on the database selected by the inherited DATABASE_URL
+    import app as api_module
+
+    # Raise handler errors into the test client, so lock errors can be told apart
+    api_module.app.config['PROPAGATE_EXCEPTIONS'] = True
+    client = api_module.app.test_client()
+    latencies = []
+    failures = {'locked': 0, 'failed': 0}
+    started_at = time.perf_counter()
+    while not stop.is_set():
+        batch = [
+            {
+                'keyword': random.choice(keywords),
+                'domain': random.choice(domains),
+                'min_rank': rank,
+                'max_rank': rank + 5,
+                'avg_rank': rank + 2.5,
+                'suggestions': [f'suggestion {random.randrange(50)}' for _ in range(5)],
+            }
+            for rank in (random.randint(1, 50) for _ in range(batch_size))
+        ]
+        started = time.perf_counter()
+        failed = outcome(lambda: client.post('/results/batch', json=batch))
+        latencies.append(time.perf_counter() - started)
+        if failed:
+            failures[failed] += 1
+    api_module.log_writer.close()
+    report.put((latencies, failures, time.perf_counter() - started_at))
+
+
+def run_mode(seconds, readers, writers, batch_size):
+    path = use_temporary_database('bench-concurrency')
+    import app as api_module
+
+    with api_module.app.app_context():
+        api_module.db.create_all()
+        api_module.upgrade_schema()
+
+    keywords, domains = seed(api_module.app.test_client())
+    api_module.app.config['PROPAGATE_EXCEPTIONS'] = True
+    read_latencies = []
+    failures = {'read': {'locked': 0, 'failed': 0}, 'write': {'locked': 0, 'failed': 0}}
+    lock = threading.Lock()
+
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    report = context.Queue()
+    processes = [
+        context.Process(target=writer, args=(keywords, domains, batch_size, stop, report)) for _ in range(writers)
+    ]
+    for process in processes:
+        process.start()
+    # Let the writers import the app and start ingesting before measuring reads
+    time.sleep(2)
+
+    reads_done = threading.Event()
+
+    def reader():
+        client = api_module.app.test_client()
+        while not reads_done.is_set():
+            path = random.choice((
+                f'/results?limit=100&domain={random.choice(domains)}',
+                '/logs?limit=50',
+                f'/results/series?keyword={random.choice(keywords).replace(" ", "%20")}',
+            ))
+            started = time.perf_counter()
+            failed = outcome(lambda: client.get(path))
+            with lock:
+                read_latencies.append(time.perf_counter() - started)
+                if failed:
+                    failures['read'][failed] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    reads_done.set()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    write_latencies = []
+    write_seconds = 0
+    for _ in processes:
+        latencies, write_failures, elapsed = report.get()
+        write_latencies.extend(latencies)
+        write_seconds = max(write_seconds, elapsed)
+        for kind, count in write_failures.items():
+            failures['write'][kind] += count
+    for process in processes:
+        process.join()
+    api_module.log_writer.close()
+    os.remove(path)
+
+    return {
+        'reads': len(read_latencies),
+        'reads_per_second': len(read_latencies) / seconds,
+        'read_ms': {key: value * 1000 for key, value in percentiles(read_latencies).items()},
+        'read_max_ms': max(read_latencies, default=0) * 1000,
+        'read_locked': failures['read']['locked'],
+        'read_failures': failures['read']['failed'],
+        'writes': len(write_latencies),
+        'results_per_second': len(write_latencies) * batch_size / write_seconds if write_seconds else 0,
+        'write_ms': {key: value * 1000 for key, value in percentiles(write_latencies).items()},
+        'write_locked': failures['write']['locked'],
+        'write_failures': failures['write']['failed'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--mode', choices=MODES, help='run a single mode in this process and print JSON')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.seconds, args.readers, args.writers, args.batch_size)))
+        return
+
+    for mode, env in MODES.items():
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.concurrency', '--mode', mode, '--seconds', str(args.seconds),
+             '--readers', str(args.readers), '--writers', str(args.writers), '--batch-size', str(args.batch_size)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        read_ms = report['read_ms']
+        print(
+            f"{mode:>8}: reads {report['reads_per_second']:8.1f}/s  "
+            f"p50 {read_ms['p50']:7.1f} ms  p95 {read_ms['p95']:7.1f} ms  p99 {read_ms['p99']:7.1f} ms  "
+            f"max {report['read_max_ms']:7.1f} ms  read locked {report['read_locked']} other failures {report['read_failures']}  |  "
+            f"ingest {report['results_per_second']:8.1f} results/s  write locked {report['write_locked']} "
+            f"other failures {report['write_failures']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
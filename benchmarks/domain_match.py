@@ -0,0 +1,88 @@
+"""Matching result URLs against tracked domains: substring scan vs. DomainMatcher.
+
+The bot used to test every tracked domain against every result URL with
+``domain in normalize_url(url)``, which costs one comparison per domain and also
+matches unrelated hosts (``ex.com`` in ``index.com``). DomainMatcher normalizes each
+URL's host once and looks it (and, in subdomain mode, its parent domains) up in a
+dict. This matches --urls result URLs against --domains tracked domains with each
+approach, and reports the time per URL and how many matches each one finds.
+
+    python -m benchmarks.domain_match [--domains 10000] [--urls 100] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from urllib.parse import urlparse
+
+from domains import EXACT, SUBDOMAIN, DomainMatcher
+
+WORDS = ('shop', 'news', 'blog', 'index', 'ex', 'data', 'cloud', 'my', 'best', 'home', 'web', 'app')
+SUFFIXES = ('com', 'net', 'org', 'co.uk', 'de', 'io')
+
+
+def old_normalize_url(url):
+    # normalize_url as it was before the matcher
+    return urlparse(url.lower()).netloc.replace('www.', '')
+
+
+def make_data(domain_count, url_count, seed):
+    rng = random.Random(seed)
+    domains = set()
+    while len(domains) < domain_count:
+        domains.add(f'{rng.choice(WORDS)}{rng.randrange(domain_count)}.{rng.choice(SUFFIXES)}')
+    domains = sorted(domains)
+    urls = []
+    for _ in range(url_count):
+        kind = rng.random()
+        if kind < 0.3:  # a tracked site
+            host = f'www.{rng.choice(domains)}'
+        elif kind < 0.5:  # a subdomain of a tracked site
+            host = f'{rng.choice(("blog", "shop", "m"))}.{rng.choice(domains)}'
+        else:  # something else, often with a tracked domain as a substring
+            host = f'{rng.choice(WORDS)}{rng.choice(domains)}'
+        urls.append(f'https://{host.upper() if rng.random() < 0.1 else host}/{rng.randrange(10**6)}?q=1')
+    return domains, urls
+
+
+def timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--domains', type=int, default=10_000)
+    parser.add_argument('--urls', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    domains, urls = make_data(args.domains, args.urls, args.seed)
+
+    def substring_scan():
+        matches = 0
+        for url in urls:
+            host = old_normalize_url(url)
+            matches += len([domain for domain in domains if domain in host])
+        return matches
+
+    print(f'{args.domains} domains x {args.urls} URLs (best of {args.repeat})')
+    matches, elapsed = timed(substring_scan, args.repeat)
+    print(f'{"substring scan":<22}{"":>12}{elapsed / len(urls) * 1e6:>12.1f} us/URL  {matches:>5} matches')
+    for mode in (EXACT, SUBDOMAIN):
+        matcher, build = timed(lambda: DomainMatcher(domains, mode), args.repeat)
+        matches, elapsed = timed(lambda: sum(len(matcher.match(url)) for url in urls), args.repeat)
+        print(
+            f'{"matcher (" + mode + ")":<22}{build * 1000:>9.1f} ms{elapsed / len(urls) * 1e6:>12.1f} us/URL  '
+            f'{matches:>5} matches'
+        )
+    print('\nThe build time is paid once per keyword; substring matches include hosts that merely contain a domain.')
+
+
+if __name__ == '__main__':
+    main()
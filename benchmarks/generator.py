@@ -0,0 +1,160 @@
+"""Seeded synthetic data for benchmarking the API.
+
+Fills the database app.py is configured for with websites, keywords, their
+keyword_website links, results (with suggestions, which are interned like on
+ingest) and audit logs, then rebuilds the daily rollups and latest results. The
+same scale and seed always produce the same rows; only their timestamps shift, as
+they cover the days leading up to the run.
+
+    python -m benchmarks.generator --scale small --output bench.db [--seed 1]
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+SCALES = {
+    'tiny': {'websites': 20, 'keywords': 200, 'links_per_keyword': 3, 'results': 20_000, 'logs': 10_000, 'days': 30},
+    'small': {'websites': 100, 'keywords': 2_000, 'links_per_keyword': 3, 'results': 200_000, 'logs': 100_000, 'days': 90},
+    'medium': {'websites': 500, 'keywords': 20_000, 'links_per_keyword': 3, 'results': 1_000_000, 'logs': 500_000, 'days': 180},
+    'large': {'websites': 2_000, 'keywords': 100_000, 'links_per_keyword': 4, 'results': 10_000_000, 'logs': 2_000_000, 'days': 365},
+}
+
+# Rows written per transaction
+CHUNK_SIZE = 20_000
+
+WORDS = (
+    'buy', 'best', 'cheap', 'online', 'review', 'price', 'near me', 'how to', 'vs', 'free',
+    'shop', 'store', 'deal', 'top', 'guide', 'new', 'used', 'rent', 'repair', 'service',
+)
+# (action, method, path) and how often it appears, mostly bot traffic
+LOG_ACTIONS = (
+    (('GET /bot', 'GET', '/bot'), 45),
+    (('POST /bot', 'POST', '/bot'), 45),
+    (('Add Keyword', 'POST', '/keywords'), 4),
+    (('Update Keyword', 'PUT', '/keywords'), 3),
+    (('Add Website', 'POST', '/websites'), 2),
+    (('Search Results Error', 'POST', '/results'), 1),
+)
+
+
+def keyword_text(index):
+    return f'{WORDS[index % len(WORDS)]} product {index}'
+
+
+def suggestion_pool(keyword):
+    return [f'{keyword} {word}' for word in WORDS[:8]]
+
+
+def generate(scale, seed=1, progress=print):
+    """Write one scale of data through app.py's models; call inside an app context."""
+    import app as api_module
+    from app import (
+        Keyword, Log, Result, Website, backfill_daily_rollups, backfill_latest_results, db, keyword_website,
+        result_suggestions_blob, update_suggestions,
+    )
+
+    sizes = SCALES[scale]
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    db.create_all()
+    api_module.upgrade_schema()
+
+    with db.engine.begin() as connection:
+        connection.execute(Website.__table__.insert(), [
+            {'id': i, 'name': f'Site {i}', 'domain': f'site{i}.example'} for i in range(1, sizes['websites'] + 1)
+        ])
+        for offset in range(0, sizes['keywords'], CHUNK_SIZE):
+            connection.execute(Keyword.__table__.insert(), [
+                {'id': i, 'keyword': keyword_text(i)}
+                for i in range(offset + 1, min(offset + CHUNK_SIZE, sizes['keywords']) + 1)
+            ])
+        # Each keyword tracks a few websites; each link has a typical rank the results vary around
+        links = []
+        for keyword_id in range(1, sizes['keywords'] + 1):
+            for website_id in rng.sample(range(1, sizes['websites'] + 1), sizes['links_per_keyword']):
+                links.append((keyword_id, website_id, rng.randint(1, 100)))
+        for offset in range(0, len(links), CHUNK_SIZE):
+            connection.execute(keyword_website.insert(), [
+                {'keyword_id': keyword_id, 'website_id': website_id}
+                for keyword_id, website_id, _ in links[offset:offset + CHUNK_SIZE]
+            ])
+    progress(f'{sizes["websites"]} websites, {sizes["keywords"]} keywords, {len(links)} links')
+
+    # Results arrive in timestamp order over the last `days` days, like bot runs do
+    end = datetime.utcnow().replace(microsecond=0)
+    start = end - timedelta(days=sizes['days'])
+    step = (end - start) / sizes['results']
+    for offset in range(0, sizes['results'], CHUNK_SIZE):
+        rows = []
+        for index in range(offset, min(offset + CHUNK_SIZE, sizes['results'])):
+            keyword_id, website_id, base_rank = links[rng.randrange(len(links))]
+            min_rank = max(1, base_rank + rng.randint(-5, 5))
+            rows.append({
+                'keyword_id': keyword_id,
+                'website_id': website_id,
+                'min_rank': min_rank,
+                'max_rank': min_rank + rng.randint(0, 10),
+                'avg_rank': min_rank + rng.random() * 5,
+                'suggestions': rng.sample(suggestion_pool(keyword_text(keyword_id)), 5),
+                'timestamp': start + step * index,
+            })
+        db.session.execute(db.insert(Result), [
+            dict(row, suggestions=result_suggestions_blob(row['suggestions'])) for row in rows
+        ])
+        update_suggestions(rows)
+        db.session.commit()
+        progress(f'{offset + len(rows)} / {sizes["results"]} results')
+    backfill_daily_rollups()
+    backfill_latest_results()
+    api_module.backfill_keyword_schedules()
+
+    log_step = (end - start) / sizes['logs']
+    with db.engine.begin() as connection:
+        for offset in range(0, sizes['logs'], CHUNK_SIZE):
+            count = min(CHUNK_SIZE, sizes['logs'] - offset)
+            actions = rng.choices([action for action, _ in LOG_ACTIONS], [weight for _, weight in LOG_ACTIONS], k=count)
+            rows = []
+            for index, (action, method, path) in enumerate(actions, offset):
+                rows.append({
+                    'action': action,
+                    'details': f'{method} {path}',
+                    'timestamp': start + log_step * index,
+                    'ip_address': f'10.0.{rng.randrange(4)}.{rng.randrange(1, 255)}',
+                    'http_method': method,
+                    'path': path,
+                    'status_code': 200 if rng.random() < 0.98 else 500,
+                })
+            connection.execute(Log.__table__.insert(), rows)
+    progress(f'{sizes["logs"]} logs')
+
+    return {
+        'scale': scale,
+        'seed': seed,
+        **sizes,
+        'links': len(links),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', required=True, help='SQLite file to create')
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        parser.error(f'{args.output} already exists')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.output)}'
+    import app as api_module
+
+    with api_module.app.app_context():
+        summary = generate(args.scale, args.seed)
+    api_module.log_writer.close()
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
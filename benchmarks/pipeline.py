@@ -0,0 +1,167 @@
+"""End-to-end bot pipeline, offline: lease keywords, rank, collect suggestions, save.
+
+Runs GoogleSearchBot against the local search stand-in (benchmarks/serp_standin.py)
+and an in-process API on a fresh SQLite file, both served over HTTP. Synthetic
+keywords track websites taken from the recorded results pages (plus some that never
+rank), so matches, clicks and uploads all happen. The bot runs until no keyword is
+due. The report gives keywords/sec, per-stage latency from the bot's run profiler,
+the API write rate, and how many of the results sent were saved, recorded as not
+ranked or rejected.
+
+By default the browser is replaced by StandInDriver (HTTP + lxml, no JavaScript), which
+measures the bot's own work. --browser drives headless Chrome against the stand-in.
+The bot's fixed waits default to 0 here; pass --wait-time etc. to include them.
+
+    python -m benchmarks.pipeline [--keywords 200] [--websites 3] [--pages 5] [--browser]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from benchmarks.common import use_temporary_database
+from benchmarks.serp_standin import FIXTURES, StandInDriver, serve
+from domains import normalize_host
+from serp_parser import parse_results, ranked_results
+
+# Tracked websites that appear on no recorded page
+UNRANKED_DOMAINS = 10
+
+
+def ranked_domains():
+    """Hosts that rank on the recorded pages."""
+    hosts = set()
+    for path in FIXTURES.glob('*.html'):
+        hosts.update(normalize_host(result.url) for result in ranked_results(parse_results(path.read_text())))
+    return sorted(hosts)
+
+
+def seed(client, keywords, websites_per_keyword, rng):
+    domains = ranked_domains() + [f'unranked{i}.example' for i in range(UNRANKED_DOMAINS)]
+    client.post('/websites/bulk', json={'websites': [{'name': domain, 'domain': domain} for domain in domains]})
+    response = client.post('/keywords/bulk', json={'keywords': [
+        {'keyword': f'pipeline keyword {i}', 'domains': rng.sample(domains, websites_per_keyword)}
+        for i in range(keywords)
+    ]})
+    if response.status_code != 200:
+        raise SystemExit(f'Seeding failed: {response.status_code} {response.text}')
+
+
+def read_summary(profile_path):
+    with open(profile_path) as profile:
+        records = [json.loads(line) for line in profile]
+    return [record for record in records if record['type'] == 'summary'][-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keywords', type=int, default=200)
+    parser.add_argument('--websites', type=int, default=3, help='websites tracked per keyword')
+    parser.add_argument('--pages', type=int, default=5, help='results pages per search on the stand-in')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every results page')
+    parser.add_argument('--due-limit', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--wait-time', type=float, default=0)
+    parser.add_argument('--stay-time', type=float, default=0)
+    parser.add_argument('--suggestion-wait', type=float, default=0)
+    parser.add_argument('--browser', action='store_true', help='drive headless Chrome instead of StandInDriver')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help="show the bot's log")
+    args = parser.parse_args()
+
+    use_temporary_database('bench-pipeline')
+    import app as api_module
+    from search_bot import GoogleSearchBot
+
+    # The bot logs every result the API rejects (e.g. unranked websites); --verbose shows them
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    with api_module.app.app_context():
+        api_module.db.create_all()
+        api_module.upgrade_schema()
+    seed(api_module.app.test_client(), args.keywords, args.websites, random.Random(args.seed))
+
+    api_server = make_server('127.0.0.1', 0, api_module.app, threaded=True)
+    threading.Thread(target=api_server.serve_forever, daemon=True).start()
+    standin = serve(page_count=args.pages, latency=args.latency_ms / 1000)
+
+    with tempfile.TemporaryDirectory() as directory:
+        profile_path = os.path.join(directory, 'profile.jsonl')
+        bot = GoogleSearchBot(
+            api_url=f'http://127.0.0.1:{api_server.server_port}',
+            wait_time=args.wait_time,
+            stay_time=args.stay_time,
+            due_limit=args.due_limit,
+            batch_size=args.batch_size,
+            spool_path=os.path.join(directory, 'spool.db'),
+            profile_path=profile_path,
+            search_url=standin.url,
+            suggestion_wait=args.suggestion_wait,
+            driver=None if args.browser else StandInDriver(),
+        )
+        started = time.perf_counter()
+        bot.run()
+        elapsed = time.perf_counter() - started
+        summary = read_summary(profile_path)
+
+    with api_module.app.app_context():
+        db = api_module.db
+        saved = db.session.scalar(db.select(db.func.count()).select_from(api_module.Result))
+        checked = db.session.scalar(
+            db.select(db.func.count()).select_from(api_module.KeywordSchedule).where(api_module.KeywordSchedule.check_count > 0)
+        )
+    api_server.shutdown()
+    standin.shutdown()
+    api_module.log_writer.close()
+
+    phases = summary['phases']
+    # Every result the bot sent is either saved, recorded as not ranked, or rejected
+    sent = summary['results']
+    not_ranked = bot.upload_counts['not_ranked']
+    rejected = bot.upload_counts['error']
+    upload_seconds = phases.get('upload', {}).get('total_seconds', 0)
+    report = {
+        'keywords': args.keywords,
+        'keywords_checked': checked,
+        'results_sent': sent,
+        'results_saved': saved,
+        'results_not_ranked': not_ranked,
+        'results_rejected': rejected,
+        'seconds': elapsed,
+        'keywords_per_second': summary['keywords'] / elapsed,
+        'results_per_second': saved / elapsed,
+        'api_writes_per_second': saved / upload_seconds if upload_seconds else None,
+        'uploads': phases.get('upload', {}).get('count', 0),
+        'phases': phases,
+        'driver': 'chrome' if args.browser else 'standin',
+    }
+
+    print(f'{summary["keywords"]} keywords ({checked} of {args.keywords} checked per the API), {saved} results saved '
+          f'in {elapsed:.1f}s with the {report["driver"]} driver')
+    print(f'{sent} results sent: {saved} saved, {not_ranked} not ranked, {rejected} rejected')
+    if rejected or saved + not_ranked + rejected != sent:
+        print(f'WARNING: {sent - saved - not_ranked} results sent were not saved')
+    print(f'{report["keywords_per_second"]:.1f} keywords/s, {report["results_per_second"]:.1f} results/s end to end')
+    if report['api_writes_per_second']:
+        print(f'API writes: {report["uploads"]} uploads, {report["api_writes_per_second"]:.0f} results/s while uploading')
+    print(f'\n{"stage":<14}{"count":>8}{"total s":>10}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}')
+    for name, stats in sorted(phases.items(), key=lambda item: -item[1]['total_seconds']):
+        print(
+            f'{name:<14}{stats["count"]:>8}{stats["total_seconds"]:>10.2f}{stats["p50_seconds"] * 1000:>10.2f}'
+            f'{stats["p95_seconds"] * 1000:>10.2f}{stats["max_seconds"] * 1000:>10.2f}'
+        )
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Ranking a results page from one page_source snapshot vs. walking its elements.
+
+The bot used to find the .tF2Cxc result blocks and then make two WebDriver calls per
+block (find the link, read its href). It now reads page_source once and parses it
+with serp_parser. This benchmark runs both over the saved pages in
+benchmarks/fixtures/serp, after checking that the parser ranks every fixture as
+recorded in benchmarks/fixtures/serp/expected.json (rank and URL of each counted
+result); a mismatch stops the run with a non-zero exit.
+
+Without a browser, the element walk is replayed on the lxml tree and its WebDriver
+calls are counted; their cost is estimated at --round-trip-ms each. With --browser,
+each fixture is opened in headless Chrome and both paths are timed for real.
+
+    python -m benchmarks.serp_parse [--iterations 50] [--round-trip-ms 1.5] [--browser] [--check-only]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from lxml import html
+
+from benchmarks.common import percentiles
+from serp_parser import parse_results, ranked_results
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'serp'
+EXPECTED = FIXTURES / 'expected.json'
+
+
+def timed(function, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        value = function()
+        samples.append(time.perf_counter() - started)
+    return value, percentiles(samples)['p50'] * 1000
+
+
+def walk_elements_offline(page_source):
+    """The old per-element path on an lxml tree, returning (hrefs, WebDriver calls it would make)."""
+    root = html.fromstring(page_source)
+    calls = 1  # find_elements(.tF2Cxc)
+    hrefs = []
+    for block in root.find_class('tF2Cxc'):
+        link = next(block.iter('a'), None)  # find_element(By.TAG_NAME, "a")
+        calls += 1
+        if link is None:
+            continue
+        hrefs.append(link.get('href'))  # get_attribute("href")
+        calls += 1
+    return hrefs, calls
+
+
+def parse_snapshot(page_source):
+    return [result.href for result in ranked_results(parse_results(page_source))]
+
+
+def check_fixtures():
+    """Compare the ranked results of every fixture with expected.json; returns the mismatches."""
+    expected = json.loads(EXPECTED.read_text())
+    failures = []
+    for path in sorted(FIXTURES.glob('*.html')):
+        if path.name not in expected:
+            failures.append(f'{path.name}: no expected results in {EXPECTED.name}')
+            continue
+        ranked = [
+            {'rank': rank, 'url': result.url}
+            for rank, result in enumerate(ranked_results(parse_results(path.read_text())), 1)
+        ]
+        wanted = expected[path.name]
+        for rank in range(max(len(ranked), len(wanted))):
+            got = ranked[rank]['url'] if rank < len(ranked) else None
+            want = wanted[rank]['url'] if rank < len(wanted) else None
+            if rank < len(wanted) and wanted[rank]['rank'] != rank + 1:
+                failures.append(f'{path.name}: {EXPECTED.name} lists rank {wanted[rank]["rank"]} in position {rank + 1}')
+            elif got != want:
+                failures.append(f'{path.name} rank {rank + 1}: expected {want}, parsed {got}')
+    return failures
+
+
+def run_offline(iterations, round_trip_ms):
+    print(f'{"fixture":<14}{"results":>8}{"calls":>7}{"walk ms":>10}{"est. walk ms":>14}{"parse ms":>10}')
+    for path in sorted(FIXTURES.glob('*.html')):
+        page_source = path.read_text()
+        (hrefs, calls), walk_ms = timed(lambda: walk_elements_offline(page_source), iterations)
+        parsed, parse_ms = timed(lambda: parse_snapshot(page_source), iterations)
+        if parsed != hrefs:
+            print(f'{path.name}: parsed results differ from the element walk')
+        print(f'{path.stem:<14}{len(parsed):>8}{calls:>7}{walk_ms:>10.2f}{walk_ms + calls * round_trip_ms:>14.2f}{parse_ms:>10.2f}')
+    print(f'\nest. walk ms = local walk + calls x {round_trip_ms} ms; the snapshot path makes 1 call (page_source).')
+
+
+def run_browser(iterations):
+    from selenium.webdriver.common.by import By
+    from search_bot import GoogleSearchBot
+
+    driver = GoogleSearchBot._init_driver()
+    try:
+        print(f'{"fixture":<14}{"results":>8}{"walk ms":>10}{"snapshot ms":>13}')
+        for path in sorted(FIXTURES.glob('*.html')):
+            driver.get(path.resolve().as_uri())
+
+            def walk():
+                return [
+                    block.find_element(By.TAG_NAME, 'a').get_attribute('href')
+                    for block in driver.find_elements(By.CSS_SELECTOR, '.tF2Cxc')
+                ]
+
+            hrefs, walk_ms = timed(walk, iterations)
+            _, snapshot_ms = timed(lambda: parse_snapshot(driver.page_source), iterations)
+            print(f'{path.stem:<14}{len(hrefs):>8}{walk_ms:>10.2f}{snapshot_ms:>13.2f}')
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--round-trip-ms', type=float, default=1.5)
+    parser.add_argument('--browser', action='store_true', help='time both paths in headless Chrome')
+    parser.add_argument('--check-only', action='store_true', help='check the parsed ranks and exit')
+    args = parser.parse_args()
+
+    failures = check_fixtures()
+    for failure in failures:
+        print(failure)
+    if failures:
+        raise SystemExit(f'{len(failures)} parsed ranks differ from {EXPECTED.name}')
+    print(f'Parsed ranks match {EXPECTED.name} for every fixture.')
+    if args.check_only:
+        return
+
+    if args.browser:
+        run_browser(args.iterations)
+    else:
+        run_offline(args.iterations, args.round_trip_ms)
+
+
+if __name__ == '__main__':
+    main()
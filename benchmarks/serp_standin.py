@@ -0,0 +1,240 @@
+"""A local stand-in for the search engine, for running the bot offline.
+
+``serve()`` starts an HTTP server that answers the requests the bot makes:
+
+- ``/``: a search form with an autocomplete list (``.erkvQe``) filled by a script from
+- ``/complete/search?q=``: a JSON list of suggestions for the typed text
+- ``/search?q=&start=``: the recorded results pages in benchmarks/fixtures/serp, with a
+  ``#pnnext`` link up to ``pages`` pages. Result links are rewritten into ``/url?q=``
+  redirects so that clicking one stays on the stand-in.
+- ``/url?q=``: an empty landing page
+
+``StandInDriver`` implements the part of the Selenium WebDriver API the bot uses over
+plain HTTP and lxml, so the bot runs against the stand-in without a browser. It runs
+no JavaScript; typing into the search box fetches the suggestions the page script
+would show.
+"""
+import json
+import random
+import re
+import threading
+import time
+from html import unescape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, quote_plus, urlencode, urljoin, urlsplit
+
+import requests
+from lxml import etree, html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'serp'
+FIRST_PAGES = ('organic.html', 'mixed.html')
+NEXT_PAGE = 'page2.html'
+SUGGESTION_WORDS = ('near me', 'price', 'review', 'best', 'online', 'cheap', 'vs', 'how to', 'for sale', '2024')
+
+HOME_PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>Search</title></head><body>
+<form action="/search" method="get"><input name="q" autocomplete="off"></form>
+<div class="erkvQe"><ul></ul></div>
+<script>
+const box = document.querySelector('input[name=q]');
+box.addEventListener('input', async () => {
+  const response = await fetch('/complete/search?q=' + encodeURIComponent(box.value));
+  const list = document.querySelector('.erkvQe ul');
+  list.replaceChildren(...(await response.json()).map(text => {
+    const item = document.createElement('li');
+    item.appendChild(document.createElement('span')).textContent = text;
+    return item;
+  }));
+});
+</script></body></html>"""
+
+LANDING_PAGE = '<!doctype html><html><head><title>Result</title></head><body><p>Landing page</p></body></html>'
+
+_result_href = re.compile(r'href="(https?://[^"]+)"')
+
+
+def suggestions_for(text):
+    """The stand-in's (deterministic) suggestions for typed text."""
+    rng = random.Random(text)
+    return [f'{text} {word}' for word in rng.sample(SUGGESTION_WORDS, rng.randint(4, 8))]
+
+
+def load_pages(fixtures=FIXTURES):
+    """The recorded pages with result links rewritten to local /url?q= redirects."""
+    return {
+        path.name: _result_href.sub(lambda m: f'href="/url?q={quote(unescape(m.group(1)), safe="")}"', path.read_text())
+        for path in fixtures.glob('*.html')
+    }
+
+
+def make_handler(pages, page_count, latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Send headers and body in one segment; split writes stall keep-alive clients on delayed ACKs
+        disable_nagle_algorithm = True
+        wbufsize = 1 << 16
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            if url.path == '/':
+                self.send('text/html', HOME_PAGE)
+            elif url.path == '/complete/search':
+                self.send('application/json', json.dumps(suggestions_for(query.get('q', ''))))
+            elif url.path == '/search':
+                if latency:
+                    time.sleep(latency)
+                self.send('text/html', self.results_page(query.get('q', ''), int(query.get('start', 0))))
+            elif url.path == '/url':
+                self.send('text/html', LANDING_PAGE)
+            else:
+                self.send('text/plain', 'Not found', status=404)
+
+        def results_page(self, q, start):
+            # First pages alternate between the recorded ones; later pages are page2
+            name = FIRST_PAGES[sum(q.encode()) % len(FIRST_PAGES)] if start == 0 else NEXT_PAGE
+            body = pages[name]
+            if start + 10 < page_count * 10:
+                return body.replace('/search?q=results&amp;start=10', f'/search?q={quote_plus(q)}&amp;start={start + 10}')
+            return body.replace('id="pnnext"', 'id="pnnext-last"')
+
+        def send(self, content_type, body, status=200):
+            data = body.encode()
+            self.send_response(status)
+            self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(page_count=5, latency=0.0, fixtures=FIXTURES):
+    """
+    Start the stand-in on a free local port in a background thread. Returns the server;
+    its home page URL is ``server.url``. Results pages are delayed by latency seconds.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(load_pages(fixtures), page_count, latency))
+    server.daemon_threads = True
+    server.url = f'http://127.0.0.1:{server.server_port}/'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def css_to_xpath(selector):
+    # Only what the bot uses: descendant combinators of tag and .class selectors
+    steps = []
+    for part in selector.split():
+        tag, *classes = part.split('.')
+        steps.append((tag or '*') + ''.join(
+            f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]" for name in classes
+        ))
+    return '//' + '//'.join(steps)
+
+
+def to_xpath(by, value):
+    if by == By.XPATH:
+        return value
+    if by == By.CSS_SELECTOR:
+        return css_to_xpath(value)
+    if by == By.TAG_NAME:
+        return f'//{value}'
+    if by in (By.ID, By.NAME):
+        return f'//*[@{by}="{value}"]'
+    raise ValueError(f'Unsupported locator: {by}')
+
+
+class StandInElement:
+    def __init__(self, driver, element):
+        self.driver = driver
+        self.element = element
+
+    @property
+    def text(self):
+        return self.element.text_content().strip()
+
+    def get_attribute(self, name):
+        return self.element.get(name)
+
+    def find_element(self, by, value):
+        return self.driver.find_element(by, value, self.element)
+
+    def click(self):
+        href = self.element.get('href')
+        if href:
+            self.driver.get(urljoin(self.driver.current_url, href))
+
+    def send_keys(self, *values):
+        typed = ''.join(values)
+        submit = Keys.RETURN in typed or Keys.ENTER in typed
+        text = (self.element.get('value') or '') + typed.replace(Keys.RETURN, '').replace(Keys.ENTER, '')
+        self.element.set('value', text)
+        form = next(self.element.iterancestors('form'), None)
+        if submit and form is not None:
+            self.driver.get(f'{urljoin(self.driver.current_url, form.get("action"))}?{urlencode({self.element.get("name"): text})}')
+        elif not submit:
+            self.driver.autocomplete(text)
+
+
+class StandInDriver:
+    """
+    The WebDriver calls GoogleSearchBot makes, served over HTTP with requests and
+    answered from the lxml tree of the current page.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.current_url = None
+        self.page_source = ''
+        self._root = None
+        self._history = []
+
+    def get(self, url):
+        response = self.session.get(url, timeout=30)
+        if self.current_url is not None:
+            self._history.append((self.current_url, self.page_source))
+        self._load(response.url, response.text)
+
+    def _load(self, url, page_source):
+        self.current_url = url
+        self.page_source = page_source
+        self._root = html.fromstring(page_source)
+
+    def back(self):
+        # Restores the previous page as it was loaded, like the browser's page cache
+        if self._history:
+            self._load(*self._history.pop())
+
+    def find_elements(self, by, value, context=None):
+        xpath = to_xpath(by, value)
+        if context is not None and xpath.startswith('//'):
+            xpath = '.' + xpath
+        return [StandInElement(self, element) for element in (context if context is not None else self._root).xpath(xpath)]
+
+    def find_element(self, by, value, context=None):
+        elements = self.find_elements(by, value, context)
+        if not elements:
+            raise NoSuchElementException(f'No element matches {by}={value}')
+        return elements[0]
+
+    def autocomplete(self, text):
+        # What the home page script does on input
+        container = next(iter(self._root.find_class('erkvQe')), None)
+        if container is None:
+            return
+        suggestions = self.session.get(urljoin(self.current_url, '/complete/search'), params={'q': text}, timeout=30).json()
+        listing = container.find('ul')
+        for item in list(listing):
+            listing.remove(item)
+        for suggestion in suggestions:
+            etree.SubElement(etree.SubElement(listing, 'li'), 'span').text = suggestion
+        self.page_source = html.tostring(self._root, encoding='unicode')
+
+    def quit(self):
+        self.session.close()
@@ -0,0 +1,65 @@
+"""
+Host normalisation and domain matching shared by the API and the search bot.
+
+The API stores Website.domain in normalised form and the bot matches result URLs
+with the same normalisation, so a domain matches no matter how it was typed.
+"""
+from urllib.parse import urlsplit
+
+# Match modes: the host must equal a tracked domain, or may also be a subdomain of it
+EXACT = "exact"
+SUBDOMAIN = "subdomain"
+
+
+def normalize_host(value):
+    """
+    Reduce a URL or bare domain to its host: lowercased, IDNA-encoded, without port,
+    credentials, trailing dot or a leading 'www.'. Returns '' if there is no host.
+    """
+    value = value.strip()
+    if "//" not in value:
+        value = "//" + value
+    try:
+        host = urlsplit(value).hostname or ""
+    except ValueError:
+        return ""
+    host = host.rstrip(".")
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+class DomainMatcher:
+    """
+    Matches URLs against a fixed set of domains with hash lookups on the URL's host
+    (and, in SUBDOMAIN mode, each of its parent domains), so the cost per URL does not
+    grow with the number of domains.
+    """
+
+    def __init__(self, domains, mode=SUBDOMAIN):
+        if mode not in (EXACT, SUBDOMAIN):
+            raise ValueError(f"Unknown match mode: {mode}")
+        self.mode = mode
+        self._domains = {}  # normalised host -> the domains as given
+        for domain in dict.fromkeys(domains):
+            host = normalize_host(domain)
+            if host:
+                self._domains.setdefault(host, []).append(domain)
+
+    def match(self, url):
+        """
+        Return the tracked domains (as given) that the URL's host belongs to.
+        """
+        host = normalize_host(url)
+        if self.mode == EXACT:
+            return list(self._domains.get(host, ()))
+        matches = []
+        while host:
+            matches.extend(self._domains.get(host, ()))
+            host = host.partition(".")[2]
+        return matches
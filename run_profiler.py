@@ -0,0 +1,144 @@
+"""
+Per-phase timing of search bot runs.
+
+Each phase (page loads, fixed waits, parsing, suggestions, uploads, ...) is timed
+exclusively: time spent in a nested phase counts only towards the inner one. Every
+checked keyword is written as one JSON line with its phase times, and the run ends
+with a summary line that the bot also sends to the API's /bot/runs.
+"""
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# Fixed waits: time the bot spends sleeping instead of working
+SLEEP = "sleep"
+
+
+def percentile(ordered, point):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, round(point / 100 * len(ordered)) - 1))]
+
+
+class RunProfiler:
+    """
+    Collects phase timings for one bot run and writes them as JSON lines to log_path
+    (or nowhere if it is None).
+    """
+
+    def __init__(self, log_path=None):
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self._log = open(log_path, "a", buffering=1) if log_path else None
+        self._stack = []  # [phase, started, time spent in nested phases]
+        self._samples = {}  # phase -> every timing of it in this run
+        self._keyword = None
+        self._keyword_seconds = []
+        self.results = 0
+
+    @contextmanager
+    def phase(self, name):
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            self._record(name, elapsed - frame[2])
+
+    def sleep(self, seconds, name=SLEEP):
+        """
+        time.sleep, timed as its own phase.
+        """
+        with self.phase(name):
+            time.sleep(seconds)
+
+    def _record(self, name, seconds):
+        self._samples.setdefault(name, []).append(seconds)
+        if self._keyword is not None:
+            phases = self._keyword["phases"]
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    def start_keyword(self, keyword, keyword_id=None):
+        self._keyword = {
+            "type": "keyword",
+            "run_id": self.run_id,
+            "keyword": keyword,
+            "keyword_id": keyword_id,
+            "started_at": datetime.utcnow().isoformat(),
+            "phases": {},
+            "_started": time.perf_counter(),
+        }
+
+    def end_keyword(self, results=0):
+        """
+        Finish the current keyword and write its record.
+        """
+        record, self._keyword = self._keyword, None
+        if record is None:
+            return
+        record["seconds"] = time.perf_counter() - record.pop("_started")
+        record["results"] = results
+        self.results += results
+        self._keyword_seconds.append(record["seconds"])
+        self._write(record)
+
+    def _write(self, record):
+        if self._log:
+            self._log.write(json.dumps(record) + "\n")
+
+    def summary(self):
+        """
+        Totals and percentiles for the run so far.
+        """
+        duration = time.perf_counter() - self._started
+        phases = {}
+        for name, samples in sorted(self._samples.items()):
+            ordered = sorted(samples)
+            phases[name] = {
+                "count": len(ordered),
+                "total_seconds": sum(ordered),
+                "p50_seconds": percentile(ordered, 50),
+                "p95_seconds": percentile(ordered, 95),
+                "max_seconds": ordered[-1],
+            }
+        keyword_seconds = sorted(self._keyword_seconds)
+        sleep_seconds = phases.get(SLEEP, {}).get("total_seconds", 0.0)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.utcnow().isoformat(),
+            "duration_seconds": duration,
+            "keywords": len(keyword_seconds),
+            "results": self.results,
+            "keywords_per_minute": len(keyword_seconds) / duration * 60 if duration > 0 else None,
+            "sleep_seconds": sleep_seconds,
+            "sleep_share": sleep_seconds / duration if duration > 0 else None,
+            "keyword_seconds": {
+                "p50": percentile(keyword_seconds, 50),
+                "p95": percentile(keyword_seconds, 95),
+                "max": keyword_seconds[-1] if keyword_seconds else None,
+            },
+            "phases": phases,
+        }
+
+    def finish(self):
+        """
+        Write the run summary, close the log and return the summary.
+        """
+        self.end_keyword()
+        summary = self.summary()
+        self._write(dict(summary, type="summary"))
+        if self._log:
+            self._log.close()
+            self._log = None
+        return summary
@@ -1,8 +1,10 @@
 import time
 import json
+import uuid
 import random
 import logging
 import requests
+from collections import Counter
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -11,31 +13,55 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from urllib.parse import urlparse
+from api_client import RETRY_STATUSES, ApiClient, ResultSpool
+from domains import DomainMatcher
+from run_profiler import RunProfiler
+from serp_parser import parse_results, ranked_results
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
-def normalize_url(url):
+def xpath_literal(value):
     """
-    Normalize the URL by removing 'http://', 'https://', 'www.', and path/query/fragment.
+    Quote a string for use in an XPath expression.
     """
-    parsed_url = urlparse(url.lower())
-    domain = parsed_url.netloc
-    return domain.replace("www.", "")
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ")"
 
 
 class GoogleSearchBot:
-    def __init__(self, api_url, max_rank=50, wait_time=5, stay_time=10,threshold=100):
+    def __init__(self, api_url, max_rank=50, wait_time=5, stay_time=10, due_limit=10, batch_size=50, flush_interval=60,
+                 spool_path="bot_spool.db", profile_path="bot_runs.jsonl", search_url="https://www.google.com/",
+                 suggestion_wait=2, driver=None):
         """
         Initialize the GoogleSearchBot with API URL, maximum rank to check, wait time, and stay time on sites.
+        Due keywords are leased from the API due_limit at a time.
+        Results are written to the spool at spool_path and uploaded once batch_size results are pending or
+        flush_interval seconds have passed. Results the API could not take stay spooled for the next upload.
+        Phase timings of every keyword and a summary of the run are appended to profile_path (None to disable).
+        search_url is the search engine's home page, suggestion_wait how long autocomplete suggestions get to load,
+        and driver an already started WebDriver to use instead of a new headless Chrome.
         """
+        self.profiler = RunProfiler(profile_path)
         self.api_url = api_url
+        self.api = ApiClient(api_url)
+        self.spool = ResultSpool(spool_path)
         self.max_rank = max_rank
         self.wait_time = wait_time
         self.stay_time = stay_time
-        self.threshold = threshold
-        self.driver = self._init_driver()
+        self.search_url = search_url
+        self.suggestion_wait = suggestion_wait
+        self.due_limit = due_limit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.upload_failed = False  # while set, uploads are only retried every flush_interval
+        self.upload_counts = Counter()  # item statuses the API answered with: created, not_ranked or error
+        with self.profiler.phase("driver_init"):
+            self.driver = driver or self._init_driver()
 
     @staticmethod
     def _init_driver():
@@ -52,18 +78,25 @@ class GoogleSearchBot:
 
     def fetch_keywords(self):
         """
-        Fetch keywords and associated websites from the API.
+        Lease the keywords that are due for a check, with their websites, from the API.
+        The API decides what is due and does not hand the same keywords to another run while they are leased.
+        The lease token is chosen here, so a retried request gets the same lease back instead of a second one.
         """
         try:
-            response = requests.get(f"{self.api_url}/bot")
+            response = self.api.get("/bot")
             response.raise_for_status()
-            response = requests.get(f"{self.api_url}/keywords")
+            response = self.api.post_idempotent(
+                "/keywords/due", json={"limit": self.due_limit, "lease_token": uuid.uuid4().hex}
+            )
             response.raise_for_status()
             logging.info(f"Request made from IP: {response.request.headers.get('X-Forwarded-For', 'N/A')}")
-            data = response.json()
+            data = response.json().get("keywords")
             if not isinstance(data, list):
                 raise ValueError("Invalid keywords format")
-            logging.info(f"Fetched {len(data)} keywords.")
+            # Results are sent under the lease, so the API records each keyword's check once
+            for item in data:
+                item["lease_token"] = response.json().get("lease_token")
+            logging.info(f"Fetched {len(data)} due keywords.")
             return data
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching keywords: {e}")
@@ -72,70 +105,89 @@ class GoogleSearchBot:
             logging.error(f"Error processing keywords data: {e}")
             return []
 
-    def search_keyword(self, keyword, domain):
+    @staticmethod
+    def summarize_ranks(ranks):
+        """
+        Reduce the ranks a website was found at to its min, max and average rank, all None (sent as null,
+        which the API records as "not ranked") if it was not found.
+        """
+        if ranks:
+            return {
+                "min_rank": min(ranks),
+                "max_rank": max(ranks),
+                "avg_rank": sum(ranks) / len(ranks),
+            }
+        return {"min_rank": None, "max_rank": None, "avg_rank": None}
+
+    def search_keyword(self, keyword, domains):
         """
-        Perform a Google search for the keyword and find the ranks of the given website.
+        Perform a Google search for the keyword and find the ranks of each of the given websites.
+        The results pages are loaded and parsed once, and every domain is matched against them.
+        Returns None if the search failed, so that nothing is reported for the keyword.
         """
+        ranks = {domain: [] for domain in domains}
+        matcher = DomainMatcher(ranks)
         try:
-            self.driver.get("https://www.google.com/")
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "q"))
-            )
+            with self.profiler.phase("page_load"):
+                self.driver.get(self.search_url)
+                search_box = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.NAME, "q"))
+                )
             search_box.send_keys(keyword)
             search_box.send_keys(Keys.RETURN)
-            time.sleep(self.wait_time)
+            self.profiler.sleep(self.wait_time)
 
             rank = 1
-            ranks = []
 
             while rank <= self.max_rank:
-                results = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".tF2Cxc"))
-                )
+                with self.profiler.phase("page_load"):
+                    WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".tF2Cxc"))
+                    )
 
+                # Parse one snapshot of the page instead of querying the browser per result
+                with self.profiler.phase("parse"):
+                    results = ranked_results(parse_results(self.driver.page_source, self.search_url))
                 for result in results:
-                    try:
-                        link = result.find_element(By.TAG_NAME, "a").get_attribute("href")
-                        link_normalized = normalize_url(link)
-
-                        if domain in link_normalized:
-                            logging.info(f"Match found for {domain} at rank {rank}.")
-                            ranks.append(rank)
-
-                            # Perform a random click and stay on the site
-                            result.find_element(By.TAG_NAME, "a").click()
-                            logging.info(f"Random click performed on {domain}. Staying on site for {self.stay_time} seconds.")
-                            time.sleep(self.stay_time)
-                            self.driver.back()
-                        rank += 1
-                        if rank > self.max_rank:
-                            break
-
-                    except Exception as e:
-                        logging.warning(f"Error parsing result: {e}")
-                        continue
+                    matched = matcher.match(result.url)
+                    for domain in matched:
+                        logging.info(f"Match found for {domain} at rank {rank}.")
+                        ranks[domain].append(rank)
+                    if matched:
+                        with self.profiler.phase("visit"):
+                            self.visit_result(result, ", ".join(matched))
+                    rank += 1
+                    if rank > self.max_rank:
+                        break
 
                 if  rank > self.max_rank:
                     break
 
                 try:
-                    next_button = self.driver.find_element(By.ID, "pnnext")
-                    next_button.click()
-                    time.sleep(self.wait_time)
+                    with self.profiler.phase("page_load"):
+                        next_button = self.driver.find_element(By.ID, "pnnext")
+                        next_button.click()
+                    self.profiler.sleep(self.wait_time)
                 except Exception:
                     logging.info("No more pages to navigate.")
                     break
 
-            if ranks:
-                return {
-                    "min_rank": min(ranks),
-                    "max_rank": max(ranks),
-                    "avg_rank": sum(ranks) / len(ranks),
-                }
-            return {"min_rank": None, "max_rank": None, "avg_rank": None}
+            return {domain: self.summarize_ranks(domain_ranks) for domain, domain_ranks in ranks.items()}
         except Exception as e:
             logging.error(f"Error during keyword search: {e}")
-            return {"min_rank": None, "max_rank": None, "avg_rank": None}
+            return None
+
+    def visit_result(self, result, domain):
+        """
+        Perform a random click on a parsed result and stay on the site.
+        """
+        try:
+            self.driver.find_element(By.XPATH, f"//a[@href={xpath_literal(result.href)}]").click()
+            logging.info(f"Random click performed on {domain}. Staying on site for {self.stay_time} seconds.")
+            self.profiler.sleep(self.stay_time, "dwell")
+            self.driver.back()
+        except Exception as e:
+            logging.warning(f"Error clicking result: {e}")
 
     def collect_suggestions(self, keyword):
         """
@@ -143,65 +195,142 @@ class GoogleSearchBot:
         """
         suggestions = []
         try:
-            self.driver.get("https://www.google.com/")
+            self.driver.get(self.search_url)
             search_box = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.NAME, "q"))
             )
             search_box.send_keys(keyword)
-            time.sleep(2)
+            self.profiler.sleep(self.suggestion_wait)
             suggestion_elements = self.driver.find_elements(By.CSS_SELECTOR, ".erkvQe li span")
             suggestions = [s.text for s in suggestion_elements if s.text]
         except Exception as e:
             logging.warning(f"Error collecting suggestions: {e}")
         return suggestions
 
-    def save_results(self, data):
+    def save_results(self, results):
         """
-        Save the search results and suggestions to the API.
+        Spool the results of one keyword and upload the spool once it is full or the flush interval has elapsed.
         """
-        try:
-            response = requests.post(f"{self.api_url}/bot", json=data)
-            response = requests.post(f"{self.api_url}/results", json=data)
+        with self.profiler.phase("spool"):
+            self.spool.append(results)
+        if time.monotonic() - self.last_flush >= self.flush_interval or (
+            len(self.spool) >= self.batch_size and not self.upload_failed
+        ):
+            self.flush_results()
+
+    def flush_results(self):
+        """
+        Upload the spooled results to the API in order, batch_size at a time, until the spool is empty or the API
+        cannot take them. Results are removed from the spool only after the API has answered for them.
+        """
+        self.last_flush = time.monotonic()
+        self.upload_failed = True
+        while True:
+            entries = self.spool.peek(self.batch_size)
+            if not entries:
+                self.upload_failed = False
+                return
+            batch = [item for _, item in entries]
+            try:
+                with self.profiler.phase("upload"):
+                    self.api.post("/bot", json={"results": len(batch)})
+                    response = self.api.post("/results/batch", json={"results": batch})
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error saving results, {len(self.spool)} kept in the spool: {e}")
+                return
             if response.status_code == 200:
-                logging.info(f"Results saved successfully for keyword: {data['keyword']}")
+                for item in response.json().get("items", []):
+                    self.upload_counts[item["status"]] += 1
+                    if item["status"] == "error":
+                        logging.error(f"Failed to save result for keyword: {batch[item['index']]['keyword']} - {item['message']}")
+                logging.info(f"{response.json().get('message')}.")
+            elif response.status_code in RETRY_STATUSES or response.status_code >= 500:
+                logging.error(f"Failed to save results: {response.status_code} - {response.text}; {len(self.spool)} kept in the spool.")
+                return
             else:
-                logging.error(f"Failed to save results: {response.status_code} - {response.text}")
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error saving results: {e}")
+                # The API rejected the whole batch; sending it again would not help
+                self.upload_counts["error"] += len(batch)
+                logging.error(f"Dropping {len(batch)} results: {response.status_code} - {response.text}")
+            self.spool.remove(entries[-1][0])
 
     def run(self):
         """
-        Main method to run the bot: fetch keywords, perform searches, collect suggestions, and save results.
+        Main method to run the bot: lease due keywords, perform searches, collect suggestions, and save results,
+        until nothing is due. Results are uploaded after each lease so the API can reschedule those keywords.
         """
         try:
-            keywords = self.fetch_keywords()
-            for item in keywords:
-                keyword = item.get("keyword")
-                websites = item.get("websites", [])
-                if item.get("search_count", 0) >= self.threshold:
-                    logging.info(f"Skipping keyword '{keyword}' as it reached its daily search threshold.")
-                    continue
-
-                for website in websites:
-                    domain = website.get("domain")
-                    ranks = self.search_keyword(keyword, domain)
-                    suggestions = self.collect_suggestions(keyword)
-                    result_data = {
-                        "keyword": keyword,
-                        "domain": domain,
-                        "min_rank": ranks["min_rank"],
-                        "max_rank": ranks["max_rank"],
-                        "avg_rank": ranks["avg_rank"],
-                        "suggestions": suggestions,
-                    }
-                    self.save_results(result_data)
+            # Results left over from an earlier run go first
+            self.flush_results()
+            checked = set()
+            while True:
+                # A keyword comes back if its lease ran out before its results were saved; leave it for the next run
+                with self.profiler.phase("fetch"):
+                    due = self.fetch_keywords()
+                keywords = [item for item in due if item.get("id") not in checked]
+                if not keywords:
+                    break
+                for item in keywords:
+                    checked.add(item.get("id"))
+                    keyword = item.get("keyword")
+                    websites = item.get("websites", [])
+
+                    domains = [website.get("domain") for website in websites if website.get("domain")]
+                    if not domains:
+                        continue
+
+                    # One search and one suggestions lookup per keyword, one result per website
+                    self.profiler.start_keyword(keyword, item.get("id"))
+                    with self.profiler.phase("search"):
+                        ranks = self.search_keyword(keyword, domains)
+                    if ranks is None:
+                        # Its lease runs out and the API hands it out again
+                        logging.warning(f"Nothing reported for '{keyword}'; it will be checked again.")
+                        self.profiler.end_keyword(0)
+                        continue
+                    with self.profiler.phase("suggestions"):
+                        suggestions = self.collect_suggestions(keyword)
+                    self.save_results([
+                        {
+                            "keyword": keyword,
+                            "domain": domain,
+                            "min_rank": ranks[domain]["min_rank"],
+                            "max_rank": ranks[domain]["max_rank"],
+                            "avg_rank": ranks[domain]["avg_rank"],
+                            "suggestions": suggestions,
+                            "lease_token": item.get("lease_token"),
+                        }
+                        for domain in domains
+                    ])
+                    self.profiler.end_keyword(len(domains))
+                self.flush_results()
 
         except Exception as e:
             logging.error(f"Critical error: {e}")
         finally:
+            self.flush_results()
+            if len(self.spool):
+                logging.warning(f"{len(self.spool)} results remain in the spool and will be uploaded on the next run.")
+            self.spool.close()
             self.driver.quit()
+            self.report_run(self.profiler.finish())
+            self.api.close()
+
+    def report_run(self, summary):
+        """
+        Log the run summary and send it to the API, where it is kept with earlier runs for comparison.
+        """
+        logging.info(
+            f"Run {summary['run_id']}: {summary['keywords']} keywords in {summary['duration_seconds']:.0f}s "
+            f"({summary['keywords_per_minute'] or 0:.1f}/min), {summary['sleep_seconds']:.0f}s in fixed waits."
+        )
+        try:
+            response = self.api.post("/bot/runs", json=summary)
+            if response.status_code != 200:
+                logging.error(f"Failed to report run: {response.status_code} - {response.text}")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error reporting run: {e}")
 
 
 if __name__ == "__main__":
-    bot = GoogleSearchBot(api_url="http://localhost:5000", max_rank=50, wait_time=5, stay_time=1,threshold=100)
+    bot = GoogleSearchBot(api_url="http://localhost:5000", max_rank=50, wait_time=5, stay_time=1, due_limit=10)
     bot.run()
@@ -0,0 +1,102 @@
+"""
+Parse Google results pages from a single page_source snapshot.
+
+The bot used to walk the results with one WebDriver call per element; parsing the
+snapshot with lxml makes one call per page and works offline on saved HTML.
+"""
+from collections import namedtuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+from lxml import etree, html
+
+# One result block on the page: the URL it points to, what kind of block it is, and
+# the href exactly as it appears in the page (for locating the link to click it)
+SerpResult = namedtuple("SerpResult", ["url", "type", "href"])
+
+ORGANIC = "organic"
+FEATURED_SNIPPET = "featured_snippet"
+AD = "ad"
+VIDEO = "video"
+NEWS = "news"
+LOCAL = "local"
+
+# Types counted when ranking a website; these are the .tF2Cxc blocks the bot always ranked
+RANKED_TYPES = (ORGANIC, FEATURED_SNIPPET)
+
+# Class of each kind of result block
+BLOCK_CLASSES = {
+    "tF2Cxc": ORGANIC,
+    "uEierd": AD,
+    "RzdJxc": VIDEO,
+    "WlydOe": NEWS,
+    "VkpGBb": LOCAL,
+}
+# Containers that change the type of the organic blocks inside them
+AD_CONTAINER_IDS = {"tads", "tadsb", "bottomads"}
+FEATURED_CONTAINER_CLASSES = {"xpdopen", "ifM9O"}
+
+GOOGLE_BASE_URL = "https://www.google.com/"
+
+
+_first_link = etree.XPath(".//a[@href]")
+
+
+def _blocks(root):
+    # One pass in document order; cheaper than an XPath class match per block type
+    for element in root.iter(etree.Element):
+        classes = element.get("class")
+        if classes:
+            matches = [name for name in classes.split() if name in BLOCK_CLASSES]
+            if matches:
+                yield element, BLOCK_CLASSES[matches[0]]
+
+
+def _block_type(element, block_type):
+    for ancestor in element.iterancestors():
+        if ancestor.get("id") in AD_CONTAINER_IDS:
+            return AD
+        if block_type == ORGANIC and FEATURED_CONTAINER_CLASSES.intersection(ancestor.get("class", "").split()):
+            block_type = FEATURED_SNIPPET
+    return block_type
+
+
+def _target_url(href, base_url):
+    """
+    Resolve an href to the page it leads to, unwrapping Google's /url?q= redirects.
+    """
+    url = urljoin(base_url, href)
+    parsed = urlparse(url)
+    if (parsed.netloc.endswith("google.com") or parsed.netloc == urlparse(base_url).netloc) and parsed.path == "/url":
+        query = parse_qs(parsed.query)
+        target = (query.get("q") or query.get("url") or [None])[0]
+        if target:
+            return target
+    return url
+
+
+def parse_results(page_source, base_url=GOOGLE_BASE_URL):
+    """
+    Return the result blocks of one results page in page order, resolving relative links against base_url.
+    Blocks nested in another block (e.g. sitelinks) are part of their parent.
+    """
+    root = html.fromstring(page_source)
+    results = []
+    matched = set()
+    for element, block_type in _blocks(root):
+        if any(ancestor in matched for ancestor in element.iterancestors()):
+            continue
+        matched.add(element)
+        link = element if element.tag == "a" and element.get("href") else next(iter(_first_link(element)), None)
+        if link is None:
+            continue
+        href = link.get("href")
+        # Ad links go through Google's click tracker; data-pcu holds the advertiser's URL
+        results.append(SerpResult(link.get("data-pcu") or _target_url(href, base_url), _block_type(element, block_type), href))
+    return results
+
+
+def ranked_results(results):
+    """
+    The results that count towards a website's rank, in rank order.
+    """
+    return [result for result in results if result.type in RANKED_TYPES]